@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import DailyStat
+
+
+@admin.register(DailyStat)
+class DailyStatAdmin(admin.ModelAdmin):
+    list_display = ['date', 'metric', 'value']
+    list_filter = ['metric']
+    date_hierarchy = 'date'
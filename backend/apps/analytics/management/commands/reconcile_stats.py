@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from apps.analytics.rollups import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily dashboard counters from appointments, patients and doctors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start_date', help='First date to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='end_date', help='Last date to rebuild (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        try:
+            start_date, end_date = [
+                datetime.strptime(options[name], '%Y-%m-%d').date() if options[name] else None
+                for name in ('start_date', 'end_date')
+            ]
+        except ValueError:
+            self.stdout.write(self.style.ERROR('ERROR: Dates must be in YYYY-MM-DD format'))
+            return
+
+        corrected = reconcile(start_date, end_date)
+        self.stdout.write(self.style.SUCCESS(f'SUCCESS: Corrected {corrected} daily counters'))
@@ -0,0 +1,179 @@
+"""
+Utilization and cancellation metrics per doctor or specialty over a date range.
+
+- scheduled_slots: slots the doctors' weekly schedules offer in the range,
+  using the default window on days without an available schedule, as the
+  availability engine does
+- booked_slots: appointments in the range that were not cancelled
+- utilization: booked_slots / scheduled_slots
+- cancellation_rate / no_show_rate: share of all appointments in the range
+- avg_lead_days: mean days between booking and appointment date
+
+Counts come from grouped queries per doctor (one over appointments, one
+over schedules) and are combined per specialty with plain sums. Results for
+closed ranges, whose appointments no longer change, are cached.
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.appointments.models import Appointment
+from apps.doctors.availability import (
+    DEFAULT_START_TIME, DEFAULT_END_TIME, DEFAULT_SLOT_DURATION, generate_slot_times
+)
+from apps.doctors.models import Doctor, Schedule, Specialty
+
+GROUP_BY_CHOICES = ('doctor', 'specialty')
+
+# Upper bound for analytics date ranges
+MAX_RANGE_DAYS = 366
+
+COUNT_FIELDS = ('scheduled_slots', 'booked_slots', 'appointments', 'cancelled', 'no_show',
+                'lead_days', 'lead_count')
+
+
+def count_weekdays(start_date, end_date):
+    """Number of times each day of week (0 = Monday) occurs between two dates."""
+    weeks, extra = divmod((end_date - start_date).days + 1, 7)
+    counts = [weeks] * 7
+    for offset in range(extra):
+        counts[(start_date.weekday() + offset) % 7] += 1
+    return counts
+
+
+def slots_per_day(start_time, end_time, slot_duration):
+    # The date only anchors the times
+    return len(generate_slot_times(datetime.min.date(), start_time, end_time, slot_duration))
+
+
+def scheduled_slot_counts(doctor_ids, start_date, end_date):
+    """Scheduled slots per doctor between two dates, from one query over the schedules."""
+    weekdays = count_weekdays(start_date, end_date)
+    default_slots = slots_per_day(DEFAULT_START_TIME, DEFAULT_END_TIME, DEFAULT_SLOT_DURATION)
+    # Every doctor starts from the default window, replaced day by day by their schedules
+    counts = {doctor_id: default_slots * sum(weekdays) for doctor_id in doctor_ids}
+    schedules = Schedule.objects.filter(doctor_id__in=doctor_ids, is_available=True).values_list(
+        'doctor_id', 'day_of_week', 'start_time', 'end_time', 'slot_duration'
+    )
+    for doctor_id, day_of_week, start_time, end_time, slot_duration in schedules:
+        slots = slots_per_day(start_time, end_time, slot_duration)
+        counts[doctor_id] += (slots - default_slots) * weekdays[day_of_week]
+    return counts
+
+
+def appointment_counts(doctor_ids, start_date, end_date):
+    """Appointment counts and lead time sums per doctor, from one grouped query."""
+    lead_time = ExpressionWrapper(
+        F('appointment_date') - TruncDate('created_at'), output_field=DurationField()
+    )
+    rows = Appointment.objects.filter(
+        doctor_id__in=doctor_ids, appointment_date__range=(start_date, end_date)
+    ).values('doctor_id').annotate(
+        appointments=Count('id'),
+        cancelled=Count('id', filter=Q(status='cancelled')),
+        no_show=Count('id', filter=Q(status='no_show')),
+        lead_time=Sum(lead_time),
+    ).order_by()
+    return {
+        row['doctor_id']: {
+            'booked_slots': row['appointments'] - row['cancelled'],
+            'appointments': row['appointments'],
+            'cancelled': row['cancelled'],
+            'no_show': row['no_show'],
+            'lead_days': (row['lead_time'] or timedelta()).days,
+            'lead_count': row['appointments'],
+        }
+        for row in rows
+    }
+
+
+def ratio(numerator, denominator):
+    return round(numerator / denominator, 4) if denominator else None
+
+
+def finish(row):
+    """Add the rates to a row of counts and drop the lead time working sums."""
+    lead_days = row.pop('lead_days')
+    lead_count = row.pop('lead_count')
+    row['utilization'] = ratio(row['booked_slots'], row['scheduled_slots'])
+    row['cancellation_rate'] = ratio(row['cancelled'], row['appointments'])
+    row['no_show_rate'] = ratio(row['no_show'], row['appointments'])
+    row['avg_lead_days'] = round(lead_days / lead_count, 2) if lead_count else None
+    return row
+
+
+def compute_metrics(start_date, end_date, group_by='doctor'):
+    """Metrics per doctor or per specialty over approved doctors, plus overall totals."""
+    doctor_names = {
+        doctor_id: f'{first_name} {last_name}'.strip()
+        for doctor_id, first_name, last_name in Doctor.objects.filter(is_approved=True).values_list(
+            'id', 'user__first_name', 'user__last_name'
+        )
+    }
+    doctor_ids = list(doctor_names)
+    scheduled = scheduled_slot_counts(doctor_ids, start_date, end_date)
+    booked = appointment_counts(doctor_ids, start_date, end_date)
+
+    per_doctor = {}
+    for doctor_id in doctor_ids:
+        counts = Counter(dict.fromkeys(COUNT_FIELDS, 0))
+        counts.update(booked.get(doctor_id, {}))
+        counts['scheduled_slots'] = scheduled[doctor_id]
+        per_doctor[doctor_id] = counts
+
+    if group_by == 'specialty':
+        names = dict(Specialty.objects.values_list('id', 'name'))
+        groups = {specialty_id: Counter(dict.fromkeys(COUNT_FIELDS, 0)) for specialty_id in names}
+        # A doctor with several specialties counts towards each of them
+        through = Doctor.specialization.through
+        for doctor_id, specialty_id in through.objects.filter(doctor_id__in=doctor_ids).values_list(
+            'doctor_id', 'specialty_id'
+        ):
+            groups[specialty_id].update(per_doctor[doctor_id])
+    else:
+        names = doctor_names
+        groups = per_doctor
+
+    totals = Counter(dict.fromkeys(COUNT_FIELDS, 0))
+    for counts in per_doctor.values():
+        totals.update(counts)
+
+    results = [
+        finish({'id': group_id, 'name': names[group_id], **dict(counts)})
+        for group_id, counts in groups.items()
+    ]
+    results.sort(key=lambda row: (row['utilization'] is None, -(row['utilization'] or 0), row['name']))
+    return {
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'group_by': group_by,
+        'totals': finish(dict(totals)),
+        'results': results,
+    }
+
+
+def is_closed(end_date):
+    """Whether a range has ended and the sweeper has closed its stale appointments."""
+    grace_days = getattr(settings, 'APPOINTMENT_SWEEP_GRACE_DAYS', 1)
+    return end_date < timezone.localdate() - timedelta(days=grace_days)
+
+
+def get_metrics(start_date, end_date, group_by='doctor'):
+    """
+    Get the metrics for a date range, cached once the range is closed.
+
+    Ranges whose appointments can still change status are always computed fresh.
+    """
+    if not is_closed(end_date):
+        return compute_metrics(start_date, end_date, group_by)
+    cache_key = f'analytics-metrics:{group_by}:{start_date}:{end_date}'
+    metrics = cache.get(cache_key)
+    if metrics is None:
+        metrics = compute_metrics(start_date, end_date, group_by)
+        cache.set(cache_key, metrics, getattr(settings, 'ANALYTICS_CACHE_SECONDS', 86400))
+    return metrics
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('metric', models.CharField(max_length=50)),
+                ('value', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'daily_stats',
+                'ordering': ['date', 'metric'],
+                'unique_together': {('date', 'metric')},
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def backfill_daily_stats(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    DailyStat = apps.get_model('analytics', 'DailyStat')
+    Appointment = apps.get_model('appointments', 'Appointment')
+    Doctor = apps.get_model('doctors', 'Doctor')
+    Patient = apps.get_model('patients', 'Patient')
+    
+    stats = [
+        DailyStat(date=row['appointment_date'], metric=f"appointments.{row['status']}", value=row['count'])
+        for row in Appointment.objects.using(alias).values('appointment_date', 'status')
+        .annotate(count=Count('id')).order_by()
+    ]
+    sources = [
+        ('patients.new', Patient.objects.using(alias).annotate(day=TruncDate('created_at'))),
+        ('doctors.new', Doctor.objects.using(alias).annotate(day=TruncDate('created_at'))),
+        ('doctors.approved', Doctor.objects.using(alias).filter(is_approved=True).annotate(
+            day=TruncDate(Coalesce('approved_at', 'created_at'))
+        )),
+    ]
+    for metric, queryset in sources:
+        stats.extend(
+            DailyStat(date=row['day'], metric=metric, value=row['count'])
+            for row in queryset.values('day').annotate(count=Count('id')).order_by()
+        )
+    DailyStat.objects.using(alias).bulk_create(stats, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('appointments', '0008_appointment_version'),
+        ('doctors', '0009_doctor_approved_at'),
+        ('patients', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_daily_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,16 @@
+from django.db import models
+
+
+class DailyStat(models.Model):
+    """A daily counter, e.g. appointments.confirmed or patients.new for one date."""
+    date = models.DateField()
+    metric = models.CharField(max_length=50)
+    value = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = 'daily_stats'
+        ordering = ['date', 'metric']
+        unique_together = ['date', 'metric']
+    
+    def __str__(self):
+        return f"{self.metric} on {self.date}: {self.value}"
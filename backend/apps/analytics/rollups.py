@@ -0,0 +1,202 @@
+"""
+Daily counter rollups behind the admin dashboard.
+
+Each DailyStat row counts one metric on one date:
+
+- appointments.<status>: appointments on that appointment date, by status
+- patients.new / doctors.new: profiles created that day
+- doctors.approved: currently approved doctors, by approval date
+
+Counters are adjusted incrementally from model signals once the
+surrounding transaction commits, and rebuilt from the source tables by
+reconcile(), which the beat schedule runs nightly to correct any drift.
+Totals are sums over the (small) rollup table instead of COUNT(*) over
+the source tables.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import DailyStat
+
+NEW_PATIENTS = 'patients.new'
+NEW_DOCTORS = 'doctors.new'
+APPROVED_DOCTORS = 'doctors.approved'
+APPOINTMENTS_PREFIX = 'appointments.'
+
+# Upper bound for dashboard trend windows
+MAX_TREND_DAYS = 366
+
+
+def appointment_metric(status):
+    return f'{APPOINTMENTS_PREFIX}{status}'
+
+
+def local_date(value):
+    """Date of a timestamp in the current time zone, as TruncDate computes it."""
+    return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+
+
+def apply_deltas(deltas):
+    """Add {(date, metric): delta} to the counters, creating missing rows."""
+    for (date, metric), delta in deltas.items():
+        if not delta:
+            continue
+        updated = DailyStat.objects.filter(date=date, metric=metric).update(value=F('value') + delta)
+        if updated:
+            continue
+        try:
+            with transaction.atomic():
+                DailyStat.objects.create(date=date, metric=metric, value=delta)
+        except IntegrityError:
+            # Created concurrently
+            DailyStat.objects.filter(date=date, metric=metric).update(value=F('value') + delta)
+
+
+def record(deltas):
+    """
+    Apply counter deltas after the current transaction commits.
+
+    Deferring keeps the hot counter rows out of booking transactions, and
+    changes that roll back are never counted.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if deltas:
+        transaction.on_commit(lambda: apply_deltas(deltas))
+
+
+def appointment_deltas(changes):
+    """Counter deltas for (old, new) pairs of (appointment_date, status), either may be None."""
+    deltas = Counter()
+    for old, new in changes:
+        if old == new:
+            continue
+        if old is not None:
+            deltas[(old[0], appointment_metric(old[1]))] -= 1
+        if new is not None:
+            deltas[(new[0], appointment_metric(new[1]))] += 1
+    return deltas
+
+
+def compute_counts(start_date=None, end_date=None):
+    """Count every metric from the source tables with grouped queries, keyed by (date, metric)."""
+    from apps.appointments.models import Appointment
+    from apps.doctors.models import Doctor
+    from apps.patients.models import Patient
+
+    def in_range(queryset, field):
+        if start_date:
+            queryset = queryset.filter(**{f'{field}__gte': start_date})
+        if end_date:
+            queryset = queryset.filter(**{f'{field}__lte': end_date})
+        return queryset
+
+    counts = {}
+    appointments = in_range(Appointment.objects.all(), 'appointment_date').values(
+        'appointment_date', 'status'
+    ).annotate(count=Count('id')).order_by()
+    for row in appointments:
+        counts[(row['appointment_date'], appointment_metric(row['status']))] = row['count']
+
+    sources = [
+        (NEW_PATIENTS, Patient.objects.annotate(day=TruncDate('created_at'))),
+        (NEW_DOCTORS, Doctor.objects.annotate(day=TruncDate('created_at'))),
+        (APPROVED_DOCTORS, Doctor.objects.filter(is_approved=True).annotate(
+            day=TruncDate(Coalesce('approved_at', 'created_at'))
+        )),
+    ]
+    for metric, queryset in sources:
+        for row in in_range(queryset, 'day').values('day').annotate(count=Count('id')).order_by():
+            counts[(row['day'], metric)] = row['count']
+    return counts
+
+
+def reconcile(start_date=None, end_date=None):
+    """
+    Rebuild the counters between two dates (all dates by default) from the source tables.
+
+    Returns the number of counters that were corrected.
+    """
+    counts = compute_counts(start_date, end_date)
+    stats = DailyStat.objects.all()
+    if start_date:
+        stats = stats.filter(date__gte=start_date)
+    if end_date:
+        stats = stats.filter(date__lte=end_date)
+
+    with transaction.atomic():
+        current = {(stat.date, stat.metric): stat for stat in stats.select_for_update()}
+        changed = []
+        for key, stat in current.items():
+            value = counts.get(key, 0)
+            if stat.value != value:
+                stat.value = value
+                changed.append(stat)
+        DailyStat.objects.bulk_update(changed, ['value'], batch_size=1000)
+        missing = [
+            DailyStat(date=date, metric=metric, value=value)
+            for (date, metric), value in counts.items()
+            if (date, metric) not in current and value
+        ]
+        DailyStat.objects.bulk_create(missing, batch_size=1000)
+    return len(changed) + len(missing)
+
+
+def get_dashboard(days=30):
+    """
+    Dashboard totals and daily trends for the last `days` days, read from the rollups.
+
+    Uses three queries: one grouped sum per metric, one for the trend window
+    and a count of the pending review queue. Rejected doctors leave the queue
+    without a counter of their own, so the queue is counted directly, with
+    the same filter as the admin queue.
+    """
+    from apps.doctors.approvals import get_pending_doctors
+
+    today = timezone.localdate()
+    start_date = today - timedelta(days=days - 1)
+
+    totals = {
+        row['metric']: row
+        for row in DailyStat.objects.values('metric').annotate(
+            total=Sum('value'),
+            today=Coalesce(Sum('value', filter=Q(date=today)), 0),
+        ).order_by()
+    }
+
+    def total(metric):
+        return totals[metric]['total'] if metric in totals else 0
+
+    appointments_by_status = {
+        metric[len(APPOINTMENTS_PREFIX):]: row['total']
+        for metric, row in totals.items() if metric.startswith(APPOINTMENTS_PREFIX)
+    }
+
+    dates = [start_date + timedelta(days=offset) for offset in range(days)]
+    series = {'appointments': Counter(), 'new_patients': Counter(), 'new_doctors': Counter(),
+              'approvals': Counter()}
+    names = {NEW_PATIENTS: 'new_patients', NEW_DOCTORS: 'new_doctors', APPROVED_DOCTORS: 'approvals'}
+    window = DailyStat.objects.filter(date__range=(start_date, today)).values_list('date', 'metric', 'value')
+    for date, metric, value in window:
+        name = 'appointments' if metric.startswith(APPOINTMENTS_PREFIX) else names.get(metric)
+        if name:
+            series[name][date] += value
+
+    return {
+        'total_patients': total(NEW_PATIENTS),
+        'total_doctors': total(NEW_DOCTORS),
+        'total_appointments': sum(appointments_by_status.values()),
+        'today_appointments': sum(
+            row['today'] for metric, row in totals.items() if metric.startswith(APPOINTMENTS_PREFIX)
+        ),
+        'pending_doctors': get_pending_doctors().count(),
+        'appointments_by_status': appointments_by_status,
+        'trends': {
+            'dates': [date.isoformat() for date in dates],
+            **{name: [counts[date] for date in dates] for name, counts in series.items()},
+        },
+    }
@@ -0,0 +1,109 @@
+"""
+Keep the daily counter rollups in step with appointments, patients and doctors.
+"""
+from collections import Counter
+
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from . import rollups
+from apps.appointments.models import Appointment
+from apps.appointments.signals import appointments_changed
+from apps.doctors.approvals import doctors_approved
+from apps.doctors.models import Doctor
+from apps.patients.models import Patient
+from apps.users.importers import users_imported
+
+
+def approval_date(is_approved, approved_at, created_at):
+    """Date a doctor counts as approved on, or None when not approved."""
+    if not is_approved:
+        return None
+    return rollups.local_date(approved_at or created_at)
+
+
+@receiver(appointments_changed)
+def count_changed_appointments(sender, changes, **kwargs):
+    rollups.record(rollups.appointment_deltas(changes))
+
+
+@receiver([pre_save, pre_delete], sender=Appointment)
+def remember_appointment(sender, instance, raw=False, **kwargs):
+    # Count from the stored date and status, the instance may be stale
+    instance._stored_slot = None
+    if not raw and not instance._state.adding:
+        instance._stored_slot = Appointment.objects.filter(pk=instance.pk).values_list(
+            'appointment_date', 'status'
+        ).first()
+
+
+@receiver(post_save, sender=Appointment)
+def count_saved_appointment(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = None if created else getattr(instance, '_stored_slot', None)
+    rollups.record(rollups.appointment_deltas([(old, (instance.appointment_date, instance.status))]))
+
+
+@receiver(post_delete, sender=Appointment)
+def count_deleted_appointment(sender, instance, **kwargs):
+    stored = getattr(instance, '_stored_slot', None) or (instance.appointment_date, instance.status)
+    rollups.record(rollups.appointment_deltas([(stored, None)]))
+
+
+@receiver(post_save, sender=Patient)
+def count_new_patient(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        rollups.record({(rollups.local_date(instance.created_at), rollups.NEW_PATIENTS): 1})
+
+
+@receiver(users_imported)
+def count_imported_users(sender, patient_ids, doctor_ids, created_at, **kwargs):
+    day = rollups.local_date(created_at)
+    rollups.record({(day, rollups.NEW_PATIENTS): len(patient_ids), (day, rollups.NEW_DOCTORS): len(doctor_ids)})
+
+
+@receiver(post_delete, sender=Patient)
+def count_deleted_patient(sender, instance, **kwargs):
+    rollups.record({(rollups.local_date(instance.created_at), rollups.NEW_PATIENTS): -1})
+
+
+@receiver([pre_save, pre_delete], sender=Doctor)
+def remember_doctor(sender, instance, raw=False, **kwargs):
+    instance._stored_approval = None
+    if not raw and not instance._state.adding:
+        stored = Doctor.objects.filter(pk=instance.pk).values_list(
+            'is_approved', 'approved_at', 'created_at'
+        ).first()
+        instance._stored_approval = stored and approval_date(*stored)
+
+
+@receiver(post_save, sender=Doctor)
+def count_saved_doctor(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    deltas = Counter()
+    if created:
+        deltas[(rollups.local_date(instance.created_at), rollups.NEW_DOCTORS)] += 1
+    old_date = None if created else getattr(instance, '_stored_approval', None)
+    new_date = approval_date(instance.is_approved, instance.approved_at, instance.created_at)
+    if old_date != new_date:
+        if old_date:
+            deltas[(old_date, rollups.APPROVED_DOCTORS)] -= 1
+        if new_date:
+            deltas[(new_date, rollups.APPROVED_DOCTORS)] += 1
+    rollups.record(deltas)
+
+
+@receiver(doctors_approved)
+def count_approved_doctors(sender, doctor_ids, approved_at, **kwargs):
+    rollups.record({(rollups.local_date(approved_at), rollups.APPROVED_DOCTORS): len(doctor_ids)})
+
+
+@receiver(post_delete, sender=Doctor)
+def count_deleted_doctor(sender, instance, **kwargs):
+    deltas = Counter({(rollups.local_date(instance.created_at), rollups.NEW_DOCTORS): -1})
+    approved_on = getattr(instance, '_stored_approval', None)
+    if approved_on:
+        deltas[(approved_on, rollups.APPROVED_DOCTORS)] -= 1
+    rollups.record(deltas)
@@ -0,0 +1,12 @@
+"""
+Scheduled analytics tasks.
+"""
+from celery import shared_task
+
+from . import rollups
+
+
+@shared_task
+def reconcile_daily_stats():
+    """Rebuild the dashboard counters from the source tables."""
+    return rollups.reconcile()
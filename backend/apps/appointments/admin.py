@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Appointment
+from .models import Appointment, WaitlistEntry
 
 
 @admin.register(Appointment)
@@ -10,3 +10,10 @@ class AppointmentAdmin(admin.ModelAdmin):
     search_fields = ['patient__user__email', 'doctor__user__email']
     date_hierarchy = 'appointment_date'
 
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ['patient', 'doctor', 'start_date', 'end_date', 'status',
+                   'offered_date', 'offered_time', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['patient__user__email', 'doctor__user__email']
@@ -0,0 +1,191 @@
+"""
+Short-lived slot holds taken while a patient completes a booking.
+
+A hold is a key per doctor/date/time with a TTL, so it expires on its own.
+Holds live in Redis when REDIS_URL is configured and in process memory
+otherwise (single-process development setups).
+"""
+import json
+import secrets
+import threading
+import time as clock
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+
+class RedisHoldStore:
+    """Hold store backed by Redis keys with an expiry."""
+
+    # Delete a key only if it still holds the caller's value
+    RELEASE_SCRIPT = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('del', KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(self, url):
+        import redis
+        self.client = redis.Redis.from_url(url, socket_timeout=1, decode_responses=True)
+
+    def acquire(self, key, value, ttl):
+        return bool(self.client.set(key, value, nx=True, ex=ttl))
+
+    def get_many(self, keys):
+        if not keys:
+            return []
+        return self.client.mget(keys)
+
+    def release(self, key, value):
+        return bool(self.client.eval(self.RELEASE_SCRIPT, 1, key, value))
+
+
+class MemoryHoldStore:
+    """Hold store kept in a process-local dict; expired entries are dropped on access."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._holds = {}
+
+    def _get(self, key, now):
+        hold = self._holds.get(key)
+        if hold is not None and hold[1] <= now:
+            del self._holds[key]
+            return None
+        return hold
+
+    def acquire(self, key, value, ttl):
+        now = clock.monotonic()
+        with self._lock:
+            if self._get(key, now) is not None:
+                return False
+            self._holds[key] = (value, now + ttl)
+            return True
+
+    def get_many(self, keys):
+        now = clock.monotonic()
+        with self._lock:
+            holds = [self._get(key, now) for key in keys]
+        return [hold[0] if hold else None for hold in holds]
+
+    def release(self, key, value):
+        with self._lock:
+            hold = self._get(key, clock.monotonic())
+            if hold is None or hold[0] != value:
+                return False
+            del self._holds[key]
+            return True
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if getattr(settings, 'SLOT_HOLD_BACKEND', 'memory') == 'redis':
+                    _store = RedisHoldStore(settings.REDIS_URL)
+                else:
+                    _store = MemoryHoldStore()
+    return _store
+
+
+def format_time(slot_time):
+    """Slot time as HH:MM, from a time object or a string."""
+    if isinstance(slot_time, str):
+        return slot_time[:5]
+    return slot_time.strftime('%H:%M')
+
+
+def get_key(doctor_id, date, slot_time):
+    return f'slot-hold:{doctor_id}:{date.isoformat()}:{format_time(slot_time)}'
+
+
+def get_hold_id(doctor_id, date, slot_time, token):
+    """Opaque hold id that also identifies the held slot."""
+    return f'{doctor_id}.{date:%Y%m%d}.{format_time(slot_time).replace(":", "")}.{token}'
+
+
+def parse_hold_id(hold_id):
+    """Return (doctor_id, date, time, token) for a hold id, or None if malformed."""
+    try:
+        doctor_id, date_str, time_str, token = hold_id.split('.', 3)
+        slot = datetime.strptime(f'{date_str}{time_str}', '%Y%m%d%H%M')
+        return int(doctor_id), slot.date(), slot.time(), token
+    except (AttributeError, ValueError):
+        return None
+
+
+def get_max_minutes():
+    return getattr(settings, 'SLOT_HOLD_MAX_MINUTES', 15)
+
+
+def hold_slot(doctor_id, date, slot_time, patient_id, minutes=None):
+    """
+    Hold a slot for a patient.
+
+    Returns the hold as a dict, or None if someone else already holds the
+    slot. A patient asking again for a slot they hold gets the existing hold.
+    """
+    minutes = min(minutes or getattr(settings, 'SLOT_HOLD_MINUTES', 10), get_max_minutes())
+    key = get_key(doctor_id, date, slot_time)
+    token = secrets.token_urlsafe(16)
+    expires_at = timezone.now() + timedelta(minutes=minutes)
+    value = json.dumps({'token': token, 'patient_id': patient_id,
+                        'expires_at': expires_at.isoformat()})
+
+    store = get_store()
+    if not store.acquire(key, value, minutes * 60):
+        existing = get_hold(doctor_id, date, slot_time)
+        if existing is None or existing['patient_id'] != patient_id:
+            return None
+        return existing
+    return {
+        'hold_id': get_hold_id(doctor_id, date, slot_time, token),
+        'patient_id': patient_id,
+        'expires_at': expires_at.isoformat(),
+    }
+
+
+def get_hold(doctor_id, date, slot_time):
+    """Get the current hold on a slot, or None."""
+    value = get_store().get_many([get_key(doctor_id, date, slot_time)])[0]
+    if value is None:
+        return None
+    hold = json.loads(value)
+    return {
+        'hold_id': get_hold_id(doctor_id, date, slot_time, hold['token']),
+        'patient_id': hold['patient_id'],
+        'expires_at': hold['expires_at'],
+    }
+
+
+def get_holder(doctor_id, date, slot_time):
+    """Id of the patient holding a slot, or None."""
+    hold = get_hold(doctor_id, date, slot_time)
+    return hold['patient_id'] if hold else None
+
+
+def get_held_slots(doctor_id, slots):
+    """Return the subset of (date, HH:MM) slots that are currently held."""
+    slots = list(slots)
+    values = get_store().get_many([get_key(doctor_id, date, slot_time) for date, slot_time in slots])
+    return {slot for slot, value in zip(slots, values) if value is not None}
+
+
+def release_hold(hold_id):
+    """Release a hold by id. Returns False if it is unknown or already expired."""
+    parsed = parse_hold_id(hold_id)
+    if parsed is None:
+        return False
+    doctor_id, date, slot_time, token = parsed
+    key = get_key(doctor_id, date, slot_time)
+    value = get_store().get_many([key])[0]
+    if value is None or json.loads(value)['token'] != token:
+        return False
+    return get_store().release(key, value)
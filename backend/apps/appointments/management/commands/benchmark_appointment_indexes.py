@@ -0,0 +1,208 @@
+import statistics
+import time as clock
+from datetime import time, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from apps.appointments.models import Appointment
+from apps.doctors.models import Doctor
+from apps.patients.models import Patient
+from apps.users.models import User
+
+BENCHMARK_DOMAIN = 'index-benchmark.invalid'
+
+SLOT_TIMES = [time(hour, minute) for hour in range(9, 17) for minute in (0, 30)]
+
+STATUSES = ['pending', 'confirmed', 'completed', 'completed', 'cancelled', 'no_show']
+
+
+class Command(BaseCommand):
+    help = ('Seed synthetic appointments and report query plans and timings '
+            'of the hot appointment queries without and with the composite indexes')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--appointments', type=int, default=1_000_000, help='Appointments to seed')
+        parser.add_argument('--doctors', type=int, default=500, help='Doctors to seed')
+        parser.add_argument('--patients', type=int, default=20_000, help='Patients to seed')
+        parser.add_argument('--runs', type=int, default=5, help='Timed runs per query')
+        parser.add_argument('--batch-size', type=int, default=10_000, help='Rows inserted per batch')
+        parser.add_argument('--keep', action='store_true',
+                            help='Keep the seeded data afterwards (with --i-know)')
+        parser.add_argument('--i-know', action='store_true',
+                            help='Run against the configured database instead of a throwaway test '
+                                 'database; its appointment indexes are dropped while measuring')
+
+    def handle(self, *args, **options):
+        self.runs = options['runs']
+        if options['i_know']:
+            self.benchmark(options, cleanup=not options['keep'])
+            return
+
+        # The indexes are dropped and a million rows seeded, so by default
+        # this runs in a test database that is destroyed afterwards
+        self.stdout.write('Creating a throwaway test database...')
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.benchmark(options, cleanup=False)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            # SQLite keeps in-memory test databases open until the name is restored
+            connection.close()
+
+    def benchmark(self, options, cleanup):
+        try:
+            doctor, patient, day = self.seed(options)
+            queries = self.get_queries(doctor, patient, day)
+
+            indexes = [index for index in Appointment._meta.indexes]
+            with connection.schema_editor() as editor:
+                for index in indexes:
+                    editor.remove_index(Appointment, index)
+            try:
+                before = self.measure('Without composite indexes', queries)
+            finally:
+                with connection.schema_editor() as editor:
+                    for index in indexes:
+                        editor.add_index(Appointment, index)
+            self.analyze()
+            after = self.measure('With composite indexes', queries)
+
+            self.stdout.write('\nSummary (median ms):')
+            for name in queries:
+                speedup = before[name] / after[name] if after[name] else float('inf')
+                self.stdout.write(f'  {name:<28} {before[name]:>10.2f} {after[name]:>10.2f}  x{speedup:.1f}')
+        finally:
+            if cleanup:
+                self.stdout.write('\nRemoving benchmark data...')
+                self.cleanup()
+
+    def seed(self, options):
+        """Create benchmark doctors, patients and appointments; returns a sample doctor, patient and day."""
+        self.cleanup()
+        batch_size = options['batch_size']
+        doctor_count = options['doctors']
+        patient_count = options['patients']
+        appointment_count = options['appointments']
+
+        self.stdout.write(f'Seeding {doctor_count} doctors and {patient_count} patients...')
+        doctor_users = User.objects.bulk_create([
+            User(email=f'doctor{index}@{BENCHMARK_DOMAIN}', first_name='Benchmark',
+                 last_name=f'Doctor {index}', user_type='doctor', password='!')
+            for index in range(doctor_count)
+        ], batch_size=batch_size)
+        patient_users = User.objects.bulk_create([
+            User(email=f'patient{index}@{BENCHMARK_DOMAIN}', first_name='Benchmark',
+                 last_name=f'Patient {index}', password='!')
+            for index in range(patient_count)
+        ], batch_size=batch_size)
+        doctors = Doctor.objects.bulk_create(
+            [Doctor(user=user, is_approved=True) for user in doctor_users], batch_size=batch_size
+        )
+        patients = Patient.objects.bulk_create(
+            [Patient(user=user) for user in patient_users], batch_size=batch_size
+        )
+
+        # Slots are enumerated per doctor so active appointments never collide;
+        # dates span the year around today
+        first_day = timezone.now().date() - timedelta(days=365)
+        self.stdout.write(f'Seeding {appointment_count} appointments...')
+        started = clock.perf_counter()
+        for start in range(0, appointment_count, batch_size):
+            batch = []
+            for number in range(start, min(start + batch_size, appointment_count)):
+                slot = number // doctor_count
+                batch.append(Appointment(
+                    doctor=doctors[number % doctor_count],
+                    patient=patients[(number * 7919) % patient_count],
+                    appointment_date=first_day + timedelta(days=(slot // len(SLOT_TIMES)) % 730),
+                    appointment_time=SLOT_TIMES[slot % len(SLOT_TIMES)],
+                    status=STATUSES[number % len(STATUSES)],
+                ))
+            with transaction.atomic():
+                Appointment.objects.bulk_create(batch)
+            self.stdout.write(f'  {start + len(batch)} rows ({clock.perf_counter() - started:.0f}s)')
+
+        self.analyze()
+        return doctors[0], patients[0], timezone.now().date()
+
+    def get_queries(self, doctor, patient, day):
+        """The appointment queries issued by the hot endpoints."""
+        active = Appointment.ACTIVE_STATUSES
+        return {
+            'patient list': lambda: list(
+                Appointment.objects.filter(patient=patient)[:20]
+            ),
+            'doctor list': lambda: list(
+                Appointment.objects.filter(doctor=doctor)[:20]
+            ),
+            'doctor list by status': lambda: list(
+                Appointment.objects.filter(doctor=doctor, status='pending')[:20]
+            ),
+            'doctor day': lambda: list(
+                Appointment.objects.filter(doctor=doctor, appointment_date=day)
+            ),
+            'available_slots booked': lambda: set(
+                Appointment.objects.filter(doctor=doctor, appointment_date=day, status__in=active)
+                .values_list('appointment_time', flat=True)
+            ),
+            'patient upcoming': lambda: list(
+                Appointment.objects.filter(patient=patient, appointment_date__gte=day, status__in=active)
+                .order_by('appointment_date', 'appointment_time')[:20]
+            ),
+            'dashboard today count': lambda: Appointment.objects.filter(appointment_date=day).count(),
+        }
+
+    def measure(self, title, queries):
+        """Print plans and return the median runtime in ms of every query."""
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n{title}'))
+        results = {}
+        for name, query in queries.items():
+            with connection.execute_wrapper(self.capture_sql):
+                self.captured = None
+                query()
+            timings = []
+            for _ in range(self.runs):
+                started = clock.perf_counter()
+                query()
+                timings.append((clock.perf_counter() - started) * 1000)
+            results[name] = statistics.median(timings)
+
+            self.stdout.write(f'{name}: {results[name]:.2f} ms')
+            sql, params = self.captured
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN {"QUERY PLAN " if connection.vendor == "sqlite" else ""}{sql}', params)
+                for row in cursor.fetchall():
+                    self.stdout.write(f'    {row[-1]}')
+        return results
+
+    def capture_sql(self, execute, sql, params, many, context):
+        self.captured = (sql, params)
+        return execute(sql, params, many, context)
+
+    def analyze(self):
+        """Refresh planner statistics after bulk changes."""
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def cleanup(self):
+        """
+        Remove the benchmark rows with plain DELETEs.
+
+        They were seeded with bulk_create, which the analytics rollups never
+        counted, so they are deleted without model signals too; deleting
+        them through the ORM would also run a signal handler per row.
+        """
+        users = User.objects.filter(email__endswith=f'@{BENCHMARK_DOMAIN}')
+        doctors = Doctor.objects.filter(user__in=users)
+        patients = Patient.objects.filter(user__in=users)
+        with transaction.atomic():
+            for queryset in (
+                Appointment.objects.filter(doctor__in=doctors),
+                Appointment.objects.filter(patient__in=patients),
+                doctors,
+                patients,
+                users,
+            ):
+                queryset._raw_delete(queryset.db)
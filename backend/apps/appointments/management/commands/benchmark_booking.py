@@ -0,0 +1,121 @@
+import threading
+import time as clock
+from datetime import time, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+from apps.appointments.models import Appointment
+from apps.appointments.services import book_appointment, bulk_update_status, SlotUnavailable
+from apps.doctors.models import Doctor
+from apps.patients.models import Patient
+from apps.users.models import User
+
+BENCHMARK_DOMAIN = 'booking-benchmark.invalid'
+
+
+class Command(BaseCommand):
+    help = 'Run many parallel bookings against one slot and check that exactly one succeeds'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=20, help='Number of parallel bookings')
+        parser.add_argument('--rounds', type=int, default=5, help='Number of slots to contend for')
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark data afterwards')
+
+    def handle(self, *args, **options):
+        threads = options['threads']
+        rounds = options['rounds']
+
+        doctor, patients = self.create_fixtures(threads)
+        slot_date = timezone.now().date() + timedelta(days=365)
+        failures = 0
+
+        try:
+            for round_number in range(rounds):
+                slot_time = time(9 + round_number % 8, 30 * (round_number // 8 % 2))
+                results, elapsed = self.contend(doctor, patients, slot_date, slot_time)
+
+                booked = Appointment.objects.filter(
+                    doctor=doctor,
+                    appointment_date=slot_date,
+                    appointment_time=slot_time,
+                    status__in=Appointment.ACTIVE_STATUSES
+                ).count()
+                ok = results['booked'] == 1 and booked == 1
+                failures += not ok
+
+                self.stdout.write(
+                    f'Slot {slot_date} {slot_time:%H:%M}: {results["booked"]} booked, '
+                    f'{results["conflict"]} conflicts, {results["error"]} errors, '
+                    f'{booked} active rows in {elapsed * 1000:.1f} ms'
+                )
+
+                # Cancelled slots must be bookable again. Cancelling goes through the
+                # service so the slot inventory and analytics rollups follow, and the
+                # ORM delete in the cleanup takes the counts back
+                bulk_update_status(doctor, [
+                    {'id': appointment_id, 'status': 'cancelled'}
+                    for appointment_id in Appointment.objects.filter(
+                        doctor=doctor, appointment_date=slot_date, appointment_time=slot_time,
+                        status__in=Appointment.ACTIVE_STATUSES
+                    ).values_list('id', flat=True)
+                ])
+                try:
+                    book_appointment(patients[0], doctor, slot_date, slot_time)
+                except SlotUnavailable:
+                    failures += 1
+                    self.stdout.write(self.style.ERROR('  Cancelled slot could not be rebooked'))
+        finally:
+            if not options['keep']:
+                User.objects.filter(email__endswith=f'@{BENCHMARK_DOMAIN}').delete()
+
+        if failures:
+            self.stdout.write(self.style.ERROR(f'FAILED: {failures} of {rounds} rounds misbehaved'))
+        else:
+            self.stdout.write(self.style.SUCCESS('SUCCESS: Every round booked its slot exactly once'))
+
+    def create_fixtures(self, count):
+        User.objects.filter(email__endswith=f'@{BENCHMARK_DOMAIN}').delete()
+        doctor_user = User.objects.create_user(
+            f'doctor@{BENCHMARK_DOMAIN}', first_name='Benchmark', last_name='Doctor',
+            user_type='doctor'
+        )
+        doctor = Doctor.objects.create(user=doctor_user, is_approved=True)
+        patients = [
+            Patient.objects.create(user=User.objects.create_user(
+                f'patient{index}@{BENCHMARK_DOMAIN}', first_name='Benchmark',
+                last_name=f'Patient {index}'
+            ))
+            for index in range(count)
+        ]
+        return doctor, patients
+
+    def contend(self, doctor, patients, slot_date, slot_time):
+        """Book one slot from every patient at once; returns outcome counts and wall time."""
+        results = {'booked': 0, 'conflict': 0, 'error': 0}
+        lock = threading.Lock()
+        barrier = threading.Barrier(len(patients))
+
+        def book(patient):
+            try:
+                barrier.wait()
+                try:
+                    book_appointment(patient, doctor, slot_date, slot_time)
+                    outcome = 'booked'
+                except SlotUnavailable:
+                    outcome = 'conflict'
+                except Exception as e:
+                    self.stderr.write(f'  {type(e).__name__}: {e}')
+                    outcome = 'error'
+                with lock:
+                    results[outcome] += 1
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=book, args=(patient,)) for patient in patients]
+        started = clock.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return results, clock.perf_counter() - started
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from apps.appointments.services import sweep_stale_appointments
+
+
+class Command(BaseCommand):
+    help = 'Mark appointments left pending as no-shows and confirmed ones as completed after their date'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-days', type=int, help='Days after the appointment date before it is closed')
+        parser.add_argument('--batch-size', type=int, help='Appointments updated per transaction')
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to wait between batches')
+
+    def handle(self, *args, **options):
+        swept = sweep_stale_appointments(
+            grace_days=options['grace_days'],
+            batch_size=options['batch_size'],
+            pause=options['pause']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"SUCCESS: Marked {swept['no_show']} appointments as no-show "
+            f"and {swept['completed']} as completed"
+        ))
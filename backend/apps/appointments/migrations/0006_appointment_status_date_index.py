@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0005_appointment_indexes'),
+        ('doctors', '0008_doctor_rating_sum'),
+        ('patients', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['status', 'appointment_date'], name='appointments_status_date_idx'),
+        ),
+    ]
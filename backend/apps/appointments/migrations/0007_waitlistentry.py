@@ -0,0 +1,38 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0006_appointment_status_date_index'),
+        ('doctors', '0008_doctor_rating_sum'),
+        ('patients', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('status', models.CharField(choices=[('waiting', 'Waiting'), ('offered', 'Offered'), ('booked', 'Booked'), ('expired', 'Expired'), ('cancelled', 'Cancelled')], default='waiting', max_length=20)),
+                ('offered_date', models.DateField(blank=True, null=True)),
+                ('offered_time', models.TimeField(blank=True, null=True)),
+                ('hold_id', models.CharField(blank=True, max_length=100)),
+                ('offer_expires_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='doctors.doctor')),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='patients.patient')),
+            ],
+            options={
+                'db_table': 'waitlist_entries',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(condition=models.Q(('status', 'waiting')), fields=['doctor', 'created_at'], name='waitlist_waiting_idx'), models.Index(condition=models.Q(('status', 'offered')), fields=['offer_expires_at'], name='waitlist_offered_idx'), models.Index(fields=['patient', 'status'], name='waitlist_patient_status_idx')],
+            },
+        ),
+    ]
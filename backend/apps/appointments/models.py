@@ -2,6 +2,14 @@ from django.db import models
 from django.utils import timezone
 
 
+class InvalidTransition(Exception):
+    """Raised when a status change is not allowed from the current status."""
+
+
+class StaleAppointment(Exception):
+    """Raised when an appointment was changed by someone else since it was read."""
+
+
 class Appointment(models.Model):
     """Appointment model."""
     
@@ -18,6 +26,18 @@ class Appointment(models.Model):
         ('no_show', 'No Show'),
     ]
     
+    # Statuses that occupy a doctor's time slot
+    ACTIVE_STATUSES = ['pending', 'confirmed']
+    
+    # Allowed status changes; completed, cancelled and no-show appointments are final
+    TRANSITIONS = {
+        'pending': ['confirmed', 'completed', 'cancelled', 'no_show'],
+        'confirmed': ['completed', 'cancelled', 'no_show'],
+        'completed': [],
+        'cancelled': [],
+        'no_show': [],
+    }
+    
     patient = models.ForeignKey('patients.Patient', on_delete=models.CASCADE, related_name='appointments')
     doctor = models.ForeignKey('doctors.Doctor', on_delete=models.CASCADE, related_name='appointments')
     appointment_date = models.DateField()
@@ -30,21 +50,83 @@ class Appointment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     cancelled_at = models.DateTimeField(blank=True, null=True)
+    # Incremented on every update, for optimistic concurrency control
+    version = models.PositiveIntegerField(default=0)
     
     class Meta:
         db_table = 'appointments'
         ordering = ['-appointment_date', '-appointment_time']
-        unique_together = ['doctor', 'appointment_date', 'appointment_time']
+        constraints = [
+            # Only active appointments hold a slot, so cancelled slots can be rebooked
+            models.UniqueConstraint(
+                fields=['doctor', 'appointment_date', 'appointment_time'],
+                condition=models.Q(status__in=['pending', 'confirmed']),
+                name='appointments_active_slot_unique'
+            ),
+        ]
+        indexes = [
+            # Patient appointment lists, newest first
+            models.Index(fields=['patient', '-appointment_date', '-appointment_time'],
+                         name='appointments_patient_date_idx'),
+            # Doctor appointment lists, newest first, optionally for one date
+            models.Index(fields=['doctor', '-appointment_date', '-appointment_time'],
+                         name='appointments_doctor_date_idx'),
+            # Doctor appointment lists filtered by status
+            models.Index(fields=['doctor', 'status', 'appointment_date'],
+                         name='appointments_doctor_stat_idx'),
+            # Per-day counts (admin dashboard)
+            models.Index(fields=['appointment_date'], name='appointments_date_idx'),
+            # Stale pending/confirmed appointments for the sweeper
+            models.Index(fields=['status', 'appointment_date'], name='appointments_status_date_idx'),
+            # Upcoming feeds only scan active appointments
+            models.Index(fields=['patient', 'appointment_date', 'appointment_time'],
+                         condition=models.Q(status__in=['pending', 'confirmed']),
+                         name='appointments_upcoming_idx'),
+        ]
     
     def __str__(self):
         return f"{self.patient.user.full_name} - {self.doctor.user.full_name} ({self.appointment_date})"
     
+    def save_changes(self, **fields):
+        """
+        Write only the given fields, if nobody updated the appointment since it was read.
+        
+        The UPDATE is conditional on the version this instance was loaded
+        with and increments it. Raises StaleAppointment when another request
+        got there first.
+        """
+        from .signals import appointments_changed
+        fields['updated_at'] = timezone.now()
+        updated = Appointment.objects.filter(pk=self.pk, version=self.version).update(
+            version=models.F('version') + 1, **fields
+        )
+        if not updated:
+            raise StaleAppointment('This appointment was changed by someone else, please reload it')
+        old = (self.appointment_date, self.status)
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self.version += 1
+        if old != (self.appointment_date, self.status):
+            appointments_changed.send(sender=Appointment, changes=[(old, (self.appointment_date, self.status))])
+    
+    def can_transition(self, new_status):
+        return new_status in self.TRANSITIONS.get(self.status, [])
+    
+    def transition(self, new_status, **fields):
+        """
+        Move to a new status, writing only the status and the given fields.
+        
+        Raises InvalidTransition for changes the state machine does not
+        allow and StaleAppointment when the appointment changed concurrently.
+        """
+        if not self.can_transition(new_status):
+            raise InvalidTransition(f'Cannot change appointment status from {self.status} to {new_status}')
+        self.save_changes(status=new_status, **fields)
+    
     def cancel(self, reason=''):
-        """Cancel appointment."""
-        self.status = 'cancelled'
-        self.cancellation_reason = reason
-        self.cancelled_at = timezone.now()
-        self.save()
+        """Cancel appointment and release its slot."""
+        from .services import cancel_appointment
+        cancel_appointment(self, reason)
     
     def is_upcoming(self):
         """Check if appointment is upcoming."""
@@ -53,3 +135,43 @@ class Appointment(models.Model):
         )
         return appointment_datetime > timezone.now() and self.status in ['pending', 'confirmed']
 
+
+class WaitlistEntry(models.Model):
+    """A patient waiting for a free slot with a doctor within a date range."""
+    
+    STATUS_CHOICES = [
+        ('waiting', 'Waiting'),
+        ('offered', 'Offered'),
+        ('booked', 'Booked'),
+        ('expired', 'Expired'),
+        ('cancelled', 'Cancelled'),
+    ]
+    
+    patient = models.ForeignKey('patients.Patient', on_delete=models.CASCADE, related_name='waitlist_entries')
+    doctor = models.ForeignKey('doctors.Doctor', on_delete=models.CASCADE, related_name='waitlist_entries')
+    start_date = models.DateField()
+    end_date = models.DateField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='waiting')
+    # The slot held for the patient while an offer is open
+    offered_date = models.DateField(blank=True, null=True)
+    offered_time = models.TimeField(blank=True, null=True)
+    hold_id = models.CharField(max_length=100, blank=True)
+    offer_expires_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'waitlist_entries'
+        ordering = ['created_at']
+        indexes = [
+            # First-come queue of a doctor's waiting patients, scanned when a slot frees up
+            models.Index(fields=['doctor', 'created_at'], condition=models.Q(status='waiting'),
+                         name='waitlist_waiting_idx'),
+            # Open offers by expiry, for the expiry job
+            models.Index(fields=['offer_expires_at'], condition=models.Q(status='offered'),
+                         name='waitlist_offered_idx'),
+            models.Index(fields=['patient', 'status'], name='waitlist_patient_status_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.patient.user.full_name} waiting for {self.doctor.user.full_name} ({self.start_date} - {self.end_date})"
@@ -1,21 +1,28 @@
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
-from .models import Appointment
+from .models import Appointment, WaitlistEntry
+from core.serializers import EagerLoadingMixin
 from apps.patients.serializers import PatientSerializer
 from apps.doctors.serializers import DoctorListSerializer
 
 
-class AppointmentSerializer(serializers.ModelSerializer):
+class AppointmentSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """Appointment serializer."""
+    select_related_fields = ('patient__user', 'doctor__user')
+    prefetch_related_fields = ('doctor__specialization',)
+    
     patient = PatientSerializer(read_only=True)
     doctor = DoctorListSerializer(read_only=True)
     doctor_id = serializers.IntegerField(write_only=True)
+    # Sent back on updates to detect changes made by someone else in between
+    version = serializers.IntegerField(min_value=0, required=False)
     
     class Meta:
         model = Appointment
         fields = ['id', 'patient', 'doctor', 'doctor_id', 'appointment_date',
                   'appointment_time', 'appointment_type', 'status', 'symptoms',
                   'notes', 'cancellation_reason', 'created_at', 'updated_at',
-                  'cancelled_at']
+                  'cancelled_at', 'version']
         read_only_fields = ['id', 'patient', 'status', 'created_at', 'updated_at',
                            'cancelled_at']
     
@@ -23,23 +30,186 @@ class AppointmentSerializer(serializers.ModelSerializer):
         """Validate appointment data."""
         # Check if doctor exists
         from apps.doctors.models import Doctor
-        try:
-            doctor = Doctor.objects.get(id=attrs['doctor_id'], is_approved=True)
-        except Doctor.DoesNotExist:
-            raise serializers.ValidationError({'doctor_id': 'Doctor not found or not approved'})
+        if 'doctor_id' in attrs:
+            try:
+                attrs['doctor'] = Doctor.objects.get(id=attrs.pop('doctor_id'), is_approved=True)
+            except Doctor.DoesNotExist:
+                raise serializers.ValidationError({'doctor_id': 'Doctor not found or not approved'})
+        
+        # Slot availability is enforced atomically when the booking is inserted
+        return attrs
+    
+    def create(self, validated_data):
+        """Book the appointment; raises SlotUnavailable if the slot is taken."""
+        from .services import book_appointment
+        validated_data.pop('status', None)
+        validated_data.pop('version', None)
+        return book_appointment(**validated_data)
+    
+    def update(self, instance, validated_data):
+        """
+        Write the changed fields if nobody else updated the appointment meanwhile.
+        
+        Raises StaleAppointment when the given (or loaded) version is out of
+        date and SlotUnavailable if it moves onto a slot that is booked or
+        held by another patient.
+        """
+        from apps.doctors.inventory import refresh_slot, sync_slot
+        from . import holds
+        from .services import SlotUnavailable, release_slots
+        previous_slot = (instance.doctor_id, instance.appointment_date, instance.appointment_time)
+        instance.version = validated_data.pop('version', instance.version)
+        changes = {
+            name: value for name, value in validated_data.items()
+            if getattr(instance, name) != value
+        }
         
-        # Check if slot is available
-        existing = Appointment.objects.filter(
-            doctor=doctor,
-            appointment_date=attrs['appointment_date'],
-            appointment_time=attrs['appointment_time'],
-            status__in=['pending', 'confirmed']
-        ).exists()
+        doctor_id = changes['doctor'].pk if 'doctor' in changes else instance.doctor_id
+        target_slot = (doctor_id, changes.get('appointment_date', instance.appointment_date),
+                       changes.get('appointment_time', instance.appointment_time))
+        if target_slot != previous_slot:
+            holder = holds.get_holder(*target_slot)
+            if holder is not None and holder != instance.patient_id:
+                raise SlotUnavailable('This time slot is being booked by another patient')
         
-        if existing:
-            raise serializers.ValidationError(
-                {'appointment_time': 'This time slot is already booked'}
-            )
+        try:
+            with transaction.atomic():
+                if changes:
+                    instance.save_changes(**changes)
+        except IntegrityError:
+            raise SlotUnavailable('This time slot is already booked')
+        appointment = instance
         
+        if previous_slot != (appointment.doctor_id, appointment.appointment_date,
+                             appointment.appointment_time):
+            refresh_slot(*previous_slot)
+            if appointment.status in Appointment.ACTIVE_STATUSES:
+                release_slots([previous_slot])
+        sync_slot(appointment)
+        return appointment
+
+
+class SlotHoldSerializer(serializers.Serializer):
+    """Request to hold a slot while the patient completes the booking."""
+    doctor_id = serializers.IntegerField()
+    appointment_date = serializers.DateField()
+    appointment_time = serializers.TimeField()
+    minutes = serializers.IntegerField(min_value=1, required=False)
+    
+    def validate(self, attrs):
+        from django.utils import timezone
+        from apps.doctors.models import Doctor
+        if not Doctor.objects.filter(id=attrs['doctor_id'], is_approved=True).exists():
+            raise serializers.ValidationError({'doctor_id': 'Doctor not found or not approved'})
+        if attrs['appointment_date'] < timezone.now().date():
+            raise serializers.ValidationError({'appointment_date': 'Cannot hold a slot in the past'})
+        return attrs
+
+
+class ConfirmHoldSerializer(serializers.Serializer):
+    """Turn a slot hold into an appointment."""
+    hold_id = serializers.CharField()
+    appointment_type = serializers.ChoiceField(choices=Appointment.APPOINTMENT_TYPE_CHOICES,
+                                               default='in_person')
+    symptoms = serializers.CharField(required=False, allow_blank=True, default='')
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+
+
+class AppointmentSeriesSerializer(serializers.Serializer):
+    """Recurring appointments with one doctor: the same time at a fixed interval."""
+    FREQUENCY_CHOICES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+    ]
+    
+    doctor_id = serializers.IntegerField()
+    start_date = serializers.DateField()
+    appointment_time = serializers.TimeField()
+    frequency = serializers.ChoiceField(choices=FREQUENCY_CHOICES, default='weekly')
+    interval = serializers.IntegerField(min_value=1, max_value=12, default=1)
+    count = serializers.IntegerField(min_value=2, max_value=52)
+    appointment_type = serializers.ChoiceField(choices=Appointment.APPOINTMENT_TYPE_CHOICES,
+                                               default='in_person')
+    symptoms = serializers.CharField(required=False, allow_blank=True, default='')
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+    skip_conflicts = serializers.BooleanField(default=True)
+    
+    def validate(self, attrs):
+        from django.utils import timezone
+        from apps.doctors.models import Doctor
+        try:
+            attrs['doctor'] = Doctor.objects.get(id=attrs.pop('doctor_id'), is_approved=True)
+        except Doctor.DoesNotExist:
+            raise serializers.ValidationError({'doctor_id': 'Doctor not found or not approved'})
+        if attrs['start_date'] < timezone.now().date():
+            raise serializers.ValidationError({'start_date': 'Cannot book appointments in the past'})
+        attrs['dates'] = self.get_dates(attrs['start_date'], attrs['frequency'],
+                                        attrs['interval'], attrs['count'])
         return attrs
+    
+    @staticmethod
+    def get_dates(start_date, frequency, interval, count):
+        """Occurrence dates; monthly series keep the day of month, clamped to short months."""
+        import calendar
+        from datetime import timedelta
+        dates = []
+        for index in range(count):
+            if frequency == 'daily':
+                dates.append(start_date + timedelta(days=index * interval))
+            elif frequency == 'weekly':
+                dates.append(start_date + timedelta(weeks=index * interval))
+            else:
+                month = start_date.month - 1 + index * interval
+                year = start_date.year + month // 12
+                month = month % 12 + 1
+                day = min(start_date.day, calendar.monthrange(year, month)[1])
+                dates.append(start_date.replace(year=year, month=month, day=day))
+        return dates
+
+
+class StatusUpdateSerializer(serializers.Serializer):
+    """One appointment status change."""
+    id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=Appointment.STATUS_CHOICES)
+
+
+class BulkStatusUpdateSerializer(serializers.Serializer):
+    """A doctor's batch of appointment status changes."""
+    updates = StatusUpdateSerializer(many=True, allow_empty=False, max_length=200)
+    
+    def validate_updates(self, value):
+        ids = [update['id'] for update in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError('Each appointment can only be updated once per request')
+        return value
+
 
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    """Waitlist entry serializer."""
+    doctor = DoctorListSerializer(read_only=True)
+    doctor_id = serializers.IntegerField(write_only=True)
+    
+    class Meta:
+        model = WaitlistEntry
+        fields = ['id', 'doctor', 'doctor_id', 'start_date', 'end_date', 'status',
+                  'offered_date', 'offered_time', 'hold_id', 'offer_expires_at',
+                  'created_at']
+        read_only_fields = ['id', 'status', 'offered_date', 'offered_time', 'hold_id',
+                            'offer_expires_at', 'created_at']
+    
+    def validate(self, attrs):
+        from django.utils import timezone
+        from apps.doctors.availability import MAX_RANGE_DAYS
+        from apps.doctors.models import Doctor
+        try:
+            attrs['doctor'] = Doctor.objects.get(id=attrs.pop('doctor_id'), is_approved=True)
+        except Doctor.DoesNotExist:
+            raise serializers.ValidationError({'doctor_id': 'Doctor not found or not approved'})
+        if attrs['start_date'] < timezone.now().date():
+            raise serializers.ValidationError({'start_date': 'Cannot wait for dates in the past'})
+        if attrs['end_date'] < attrs['start_date']:
+            raise serializers.ValidationError({'end_date': 'End date must not be before start date'})
+        if (attrs['end_date'] - attrs['start_date']).days >= MAX_RANGE_DAYS:
+            raise serializers.ValidationError({'end_date': f'Date range cannot exceed {MAX_RANGE_DAYS} days'})
+        return attrs
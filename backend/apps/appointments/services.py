@@ -0,0 +1,285 @@
+"""
+Appointment booking and status services.
+"""
+import time as clock
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import holds
+from .models import Appointment
+from .signals import appointments_changed
+
+
+class SlotUnavailable(Exception):
+    """Raised when a doctor's time slot is already taken."""
+
+
+def book_appointment(patient, doctor, appointment_date, appointment_time, **fields):
+    """
+    Reserve a slot and create its appointment atomically.
+    
+    The insert itself is the reservation: the partial unique constraint on
+    active appointments lets exactly one of any number of concurrent
+    bookings for the same slot commit, while cancelled appointments never
+    block a slot. Raises SlotUnavailable for the others, and when another
+    patient holds the slot.
+    """
+    from apps.doctors.inventory import sync_slot
+    
+    holder = holds.get_holder(doctor.pk, appointment_date, appointment_time)
+    if holder is not None and holder != patient.pk:
+        raise SlotUnavailable('This time slot is being booked by another patient')
+    
+    try:
+        with transaction.atomic():
+            appointment = Appointment.objects.create(
+                patient=patient,
+                doctor=doctor,
+                appointment_date=appointment_date,
+                appointment_time=appointment_time,
+                status='pending',
+                **fields
+            )
+            sync_slot(appointment)
+    except IntegrityError:
+        raise SlotUnavailable('This time slot is already booked')
+    return appointment
+
+
+def book_series(patient, doctor, dates, appointment_time, skip_conflicts=True, **fields):
+    """
+    Book the same slot with a doctor on many dates at once.
+    
+    Conflicts for all dates are found with one query (plus one hold lookup)
+    and the free occurrences are inserted with bulk_create in a single
+    transaction. Returns (appointments, conflicts) where conflicts is a
+    list of (date, reason). With skip_conflicts=False nothing is booked if
+    any date conflicts. Raises SlotUnavailable if concurrent bookings keep
+    taking the slots between the check and the insert.
+    """
+    from apps.doctors.inventory import refresh_slots
+    
+    for attempt in range(2):
+        booked = set(Appointment.objects.filter(
+            doctor=doctor,
+            appointment_date__in=dates,
+            appointment_time=appointment_time,
+            status__in=Appointment.ACTIVE_STATUSES
+        ).values_list('appointment_date', flat=True))
+        held = holds.get_held_slots(doctor.pk, [(date, appointment_time) for date in dates])
+        
+        conflicts = []
+        free_dates = []
+        for date in dates:
+            if date in booked:
+                conflicts.append((date, 'booked'))
+            elif (date, appointment_time) in held:
+                conflicts.append((date, 'held'))
+            else:
+                free_dates.append(date)
+        if not free_dates or (conflicts and not skip_conflicts):
+            return [], conflicts
+        
+        try:
+            with transaction.atomic():
+                appointments = Appointment.objects.bulk_create([
+                    Appointment(
+                        patient=patient,
+                        doctor=doctor,
+                        appointment_date=date,
+                        appointment_time=appointment_time,
+                        status='pending',
+                        **fields
+                    )
+                    for date in free_dates
+                ])
+                refresh_slots((doctor.pk, date, appointment_time) for date in free_dates)
+                appointments_changed.send(sender=Appointment, changes=[
+                    (None, (date, 'pending')) for date in free_dates
+                ])
+            return appointments, conflicts
+        except IntegrityError:
+            # A slot was booked since the check; look again
+            continue
+    raise SlotUnavailable('Some of these time slots were just booked, please try again')
+
+
+def release_slots(slots):
+    """
+    Offer (doctor_id, date, time) slots that appointments just gave up to the waitlist.
+    
+    Every change that frees a slot ends here once the inventory is updated:
+    cancelling, rejecting, a status change out of the active statuses,
+    single or bulk, moving an appointment to another slot and deleting it.
+    """
+    from .waitlist import offer_slot
+    
+    for doctor_id, date, slot_time in dict.fromkeys(slots):
+        offer_slot(doctor_id, date, slot_time)
+
+
+def set_status(appointment, new_status, **fields):
+    """
+    Move an appointment to a new status through its state machine.
+    
+    Keeps the slot inventory in step and releases the slot when the
+    appointment stops holding it. Raises InvalidTransition and
+    StaleAppointment like Appointment.transition().
+    """
+    from apps.doctors.inventory import sync_slot
+    
+    was_active = appointment.status in Appointment.ACTIVE_STATUSES
+    appointment.transition(new_status, **fields)
+    sync_slot(appointment)
+    if was_active and new_status not in Appointment.ACTIVE_STATUSES:
+        release_slots([(appointment.doctor_id, appointment.appointment_date, appointment.appointment_time)])
+
+
+def cancel_appointment(appointment, reason=''):
+    """Cancel an appointment and release its slot."""
+    set_status(appointment, 'cancelled', cancellation_reason=reason, cancelled_at=timezone.now())
+
+
+def delete_appointment(appointment):
+    """Delete an appointment, updating its slot's inventory row and releasing the slot if it held it."""
+    from apps.doctors.inventory import refresh_slot
+    
+    slot = (appointment.doctor_id, appointment.appointment_date, appointment.appointment_time)
+    was_active = appointment.status in Appointment.ACTIVE_STATUSES
+    appointment.delete()
+    refresh_slot(*slot)
+    if was_active:
+        release_slots([slot])
+
+
+def get_updated_ids(ids, updated, new_status, updated_at):
+    """
+    Ids among `ids` that a conditional UPDATE setting `new_status` at `updated_at` wrote.
+    
+    `updated` is the row count the UPDATE returned; only when it falls short
+    are the rows looked up again.
+    """
+    if updated == len(ids):
+        return set(ids)
+    return set(Appointment.objects.filter(
+        id__in=ids, status=new_status, updated_at=updated_at
+    ).values_list('id', flat=True))
+
+
+def bulk_update_status(doctor, updates):
+    """
+    Apply many status changes to a doctor's appointments in one transaction.
+    
+    `updates` is a list of {'id', 'status'} dicts. Ownership is checked with
+    a single query and the changes are written with one UPDATE per status
+    change, conditional on the status that was read. Returns a list of
+    {'id', 'result'} dicts where result is one of 'updated', 'unchanged',
+    'not_found', 'invalid_transition' (not allowed by Appointment.TRANSITIONS)
+    or 'conflict' (changed by someone else in the meantime).
+    """
+    from apps.doctors.inventory import refresh_slots
+    
+    with transaction.atomic():
+        current = {
+            appointment['id']: appointment
+            for appointment in Appointment.objects.select_for_update().filter(
+                doctor=doctor, id__in=[update['id'] for update in updates]
+            ).values('id', 'doctor_id', 'appointment_date', 'appointment_time', 'status')
+        }
+        
+        results = {}
+        groups = {}
+        for update in updates:
+            appointment = current.get(update['id'])
+            if appointment is None:
+                results[update['id']] = 'not_found'
+            elif appointment['status'] == update['status']:
+                results[update['id']] = 'unchanged'
+            elif update['status'] not in Appointment.TRANSITIONS[appointment['status']]:
+                results[update['id']] = 'invalid_transition'
+            else:
+                groups.setdefault((appointment['status'], update['status']), []).append(update['id'])
+        
+        now = timezone.now()
+        for (old_status, new_status), ids in groups.items():
+            updated = Appointment.objects.filter(id__in=ids, status=old_status).update(
+                status=new_status, version=F('version') + 1, updated_at=now
+            )
+            written = get_updated_ids(ids, updated, new_status, now)
+            for appointment_id in ids:
+                results[appointment_id] = 'updated' if appointment_id in written else 'conflict'
+        
+        # Only changes between active and inactive statuses affect the slot inventory
+        changed_slots = []
+        freed_slots = []
+        changes = []
+        for (old_status, new_status), ids in groups.items():
+            for appointment_id in ids:
+                appointment = current[appointment_id]
+                if results[appointment_id] != 'updated':
+                    continue
+                changes.append(((appointment['appointment_date'], old_status),
+                                (appointment['appointment_date'], new_status)))
+                if (old_status in Appointment.ACTIVE_STATUSES) != (new_status in Appointment.ACTIVE_STATUSES):
+                    slot = (appointment['doctor_id'], appointment['appointment_date'],
+                            appointment['appointment_time'])
+                    changed_slots.append(slot)
+                    if old_status in Appointment.ACTIVE_STATUSES:
+                        freed_slots.append(slot)
+        refresh_slots(changed_slots)
+        appointments_changed.send(sender=Appointment, changes=changes)
+    release_slots(freed_slots)
+    return [{'id': update['id'], 'result': results[update['id']]} for update in updates]
+
+
+# Status the sweeper gives appointments left open after their date
+STALE_STATUS_TRANSITIONS = {
+    'pending': 'no_show',
+    'confirmed': 'completed',
+}
+
+
+def sweep_stale_appointments(grace_days=None, batch_size=None, pause=0):
+    """
+    Close appointments left pending or confirmed after their date.
+    
+    Pending appointments become no-shows and confirmed ones completed once
+    `grace_days` have passed since their date. Rows are handled in batches,
+    each one short transaction with a conditional UPDATE, so an appointment
+    whose status changes concurrently is left alone and locks stay short.
+    Returns the number of appointments moved, keyed by new status.
+    """
+    if grace_days is None:
+        grace_days = getattr(settings, 'APPOINTMENT_SWEEP_GRACE_DAYS', 1)
+    batch_size = batch_size or getattr(settings, 'APPOINTMENT_SWEEP_BATCH_SIZE', 500)
+    cutoff = timezone.now().date() - timedelta(days=grace_days)
+    
+    swept = {}
+    for old_status, new_status in STALE_STATUS_TRANSITIONS.items():
+        swept[new_status] = 0
+        stale = Appointment.objects.filter(status=old_status, appointment_date__lte=cutoff)
+        while True:
+            dates = dict(stale.order_by('appointment_date', 'id').values_list('id', 'appointment_date')[:batch_size])
+            if not dates:
+                break
+            ids = list(dates)
+            now = timezone.now()
+            with transaction.atomic():
+                updated = Appointment.objects.filter(id__in=ids, status=old_status).update(
+                    status=new_status, version=F('version') + 1, updated_at=now
+                )
+                written = get_updated_ids(ids, updated, new_status, now)
+                appointments_changed.send(sender=Appointment, changes=[
+                    ((dates[appointment_id], old_status), (dates[appointment_id], new_status))
+                    for appointment_id in written
+                ])
+            swept[new_status] += len(written)
+            if len(ids) < batch_size:
+                break
+            if pause:
+                clock.sleep(pause)
+    return swept
@@ -0,0 +1,9 @@
+"""
+Signals for appointment writes that bypass Model.save() and delete().
+"""
+from django.dispatch import Signal
+
+# Sent after appointments are created with bulk_create() or change status or
+# date through QuerySet.update(). `changes` is a list of (old, new) pairs of
+# (appointment_date, status) tuples; `old` is None for new appointments.
+appointments_changed = Signal()
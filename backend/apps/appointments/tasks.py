@@ -0,0 +1,18 @@
+"""
+Scheduled appointment tasks.
+"""
+from celery import shared_task
+
+from . import services, waitlist
+
+
+@shared_task
+def sweep_stale_appointments():
+    """Close appointments left pending or confirmed after their date."""
+    return services.sweep_stale_appointments()
+
+
+@shared_task
+def expire_waitlist_offers():
+    """Expire unanswered waitlist offers and pass their slots on."""
+    return waitlist.expire_offers()
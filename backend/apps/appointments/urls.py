@@ -1,8 +1,9 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AppointmentViewSet
+from .views import AppointmentViewSet, WaitlistViewSet
 
 router = DefaultRouter()
+router.register(r'waitlist', WaitlistViewSet, basename='waitlist')
 router.register(r'', AppointmentViewSet, basename='appointment')
 
 urlpatterns = [
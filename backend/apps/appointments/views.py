@@ -1,12 +1,19 @@
-from rest_framework import viewsets, status, serializers
+from rest_framework import viewsets, mixins, status, serializers
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.db.models import prefetch_related_objects
 from django.utils import timezone
-from .models import Appointment
-from .serializers import AppointmentSerializer
+from .models import Appointment, WaitlistEntry, InvalidTransition, StaleAppointment
+from . import holds, waitlist
+from .serializers import (AppointmentSerializer, SlotHoldSerializer, ConfirmHoldSerializer,
+                          BulkStatusUpdateSerializer, WaitlistEntrySerializer,
+                          AppointmentSeriesSerializer)
+from .services import (SlotUnavailable, book_appointment, book_series, bulk_update_status,
+                       delete_appointment, set_status)
 from apps.patients.models import Patient
 from apps.doctors.models import Doctor
+from core.pagination import KeysetPagination, SwitchablePagination
 
 
 class AppointmentViewSet(viewsets.ModelViewSet):
@@ -14,6 +21,8 @@ class AppointmentViewSet(viewsets.ModelViewSet):
     queryset = Appointment.objects.all()
     serializer_class = AppointmentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = SwitchablePagination
+    keyset_ordering = ('-appointment_date', '-appointment_time', '-id')
     
     def get_queryset(self):
         """Filter appointments based on user type."""
@@ -36,15 +45,207 @@ class AppointmentViewSet(viewsets.ModelViewSet):
             return Appointment.objects.all()
         return Appointment.objects.none()
     
-    def perform_create(self, serializer):
-        """Create appointment and set patient."""
+    def create(self, request, *args, **kwargs):
+        """Book an appointment; a slot taken by someone else is a conflict."""
+        try:
+            return super().create(request, *args, **kwargs)
+        except SlotUnavailable as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_409_CONFLICT
+            )
+    
+    def update(self, request, *args, **kwargs):
         try:
-            patient = Patient.objects.get(user=self.request.user)
+            return super().update(request, *args, **kwargs)
+        except (SlotUnavailable, StaleAppointment) as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_409_CONFLICT
+            )
+    
+    def perform_destroy(self, instance):
+        delete_appointment(instance)
+    
+    def get_patient(self):
+        """Get the current user's patient profile."""
+        try:
+            return Patient.objects.get(user=self.request.user)
         except Patient.DoesNotExist:
             # Auto-create patient profile if it doesn't exist
-            patient = Patient.objects.create(user=self.request.user)
+            return Patient.objects.create(user=self.request.user)
+    
+    def perform_create(self, serializer):
+        """Create appointment and set patient."""
+        serializer.save(patient=self.get_patient(), status='pending')
+    
+    @action(detail=False, methods=['post'])
+    def series(self, request):
+        """Book a recurring series of appointments with one doctor."""
+        if request.user.user_type != 'patient':
+            return Response(
+                {'error': 'Only patients can book appointments'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        serializer = AppointmentSeriesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        try:
+            appointments, conflicts = book_series(
+                self.get_patient(), data['doctor'], data['dates'], data['appointment_time'],
+                skip_conflicts=data['skip_conflicts'],
+                appointment_type=data['appointment_type'],
+                symptoms=data['symptoms'],
+                notes=data['notes']
+            )
+        except SlotUnavailable as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_409_CONFLICT
+            )
         
-        serializer.save(patient=patient, status='pending')
+        conflicts = [{'appointment_date': date, 'reason': reason} for date, reason in conflicts]
+        if not appointments:
+            return Response(
+                {'error': 'None of the appointments could be booked', 'conflicts': conflicts},
+                status=status.HTTP_409_CONFLICT
+            )
+        prefetch_related_objects(appointments, *AppointmentSerializer.select_related_fields,
+                                 *AppointmentSerializer.prefetch_related_fields)
+        return Response({
+            'appointments': self.get_serializer(appointments, many=True).data,
+            'conflicts': conflicts,
+        }, status=status.HTTP_201_CREATED)
+    
+    @action(detail=False, methods=['post'])
+    def hold(self, request):
+        """Hold a slot for a few minutes while the patient completes the booking."""
+        if request.user.user_type != 'patient':
+            return Response(
+                {'error': 'Only patients can hold slots'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        serializer = SlotHoldSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        booked = Appointment.objects.filter(
+            doctor_id=data['doctor_id'],
+            appointment_date=data['appointment_date'],
+            appointment_time=data['appointment_time'],
+            status__in=Appointment.ACTIVE_STATUSES
+        ).exists()
+        if booked:
+            return Response(
+                {'error': 'This time slot is already booked'},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        hold = holds.hold_slot(
+            data['doctor_id'], data['appointment_date'], data['appointment_time'],
+            self.get_patient().pk, data.get('minutes')
+        )
+        if hold is None:
+            return Response(
+                {'error': 'This time slot is being booked by another patient'},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response({
+            'hold_id': hold['hold_id'],
+            'doctor_id': data['doctor_id'],
+            'appointment_date': data['appointment_date'],
+            'appointment_time': data['appointment_time'].strftime('%H:%M'),
+            'expires_at': hold['expires_at'],
+        }, status=status.HTTP_201_CREATED)
+    
+    @action(detail=False, methods=['post'])
+    def confirm_hold(self, request):
+        """Convert a slot hold into an appointment."""
+        serializer = ConfirmHoldSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        parsed = holds.parse_hold_id(data['hold_id'])
+        patient = self.get_patient()
+        hold = parsed and holds.get_hold(*parsed[:3])
+        if not hold or hold['hold_id'] != data['hold_id'] or hold['patient_id'] != patient.pk:
+            return Response(
+                {'error': 'Hold not found or expired'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        doctor_id, appointment_date, appointment_time, _ = parsed
+        try:
+            doctor = Doctor.objects.get(id=doctor_id, is_approved=True)
+            appointment = book_appointment(
+                patient, doctor, appointment_date, appointment_time,
+                appointment_type=data['appointment_type'],
+                symptoms=data['symptoms'],
+                notes=data['notes']
+            )
+        except Doctor.DoesNotExist:
+            return Response(
+                {'error': 'Doctor not found or not approved'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except SlotUnavailable as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        holds.release_hold(data['hold_id'])
+        waitlist.mark_booked(data['hold_id'])
+        return Response(self.get_serializer(appointment).data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=False, methods=['post'])
+    def release_hold(self, request):
+        """Give up a slot hold before it expires."""
+        hold_id = request.data.get('hold_id', '')
+        parsed = holds.parse_hold_id(hold_id)
+        hold = parsed and holds.get_hold(*parsed[:3])
+        if not hold or hold['hold_id'] != hold_id or hold['patient_id'] != self.get_patient().pk:
+            return Response(
+                {'error': 'Hold not found or expired'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        holds.release_hold(hold_id)
+        return Response({'message': 'Hold released'})
+    
+    def change_status(self, appointment, change, *args, **kwargs):
+        """
+        Run a status change against the version of the appointment the client saw.
+        
+        Clients may send the `version` they last read; otherwise the version
+        loaded for this request is used. Returns an error response when the
+        change is not allowed or lost a race, else None.
+        """
+        version = self.request.data.get('version')
+        if version is not None:
+            try:
+                appointment.version = int(version)
+            except (TypeError, ValueError):
+                return Response(
+                    {'error': 'Invalid version'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        try:
+            change(*args, **kwargs)
+        except InvalidTransition as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except StaleAppointment as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_409_CONFLICT
+            )
+        return None
     
     @action(detail=True, methods=['post'])
     def cancel(self, request, pk=None):
@@ -66,7 +267,9 @@ class AppointmentViewSet(viewsets.ModelViewSet):
                 )
         
         reason = request.data.get('reason', '')
-        appointment.cancel(reason)
+        error = self.change_status(appointment, appointment.cancel, reason)
+        if error:
+            return error
         serializer = self.get_serializer(appointment)
         return Response(serializer.data)
     
@@ -87,8 +290,9 @@ class AppointmentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        appointment.status = 'confirmed'
-        appointment.save()
+        error = self.change_status(appointment, set_status, appointment, 'confirmed')
+        if error:
+            return error
         serializer = self.get_serializer(appointment)
         return Response(serializer.data)
     
@@ -110,9 +314,10 @@ class AppointmentViewSet(viewsets.ModelViewSet):
             )
         
         reason = request.data.get('reason', 'Rejected by admin')
-        appointment.status = 'cancelled'
-        appointment.cancellation_reason = reason
-        appointment.save()
+        error = self.change_status(appointment, set_status, appointment, 'cancelled',
+                                   cancellation_reason=reason)
+        if error:
+            return error
         serializer = self.get_serializer(appointment)
         return Response(serializer.data)
     
@@ -139,27 +344,129 @@ class AppointmentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        appointment.status = new_status
-        appointment.save()
+        error = self.change_status(appointment, set_status, appointment, new_status)
+        if error:
+            return error
         serializer = self.get_serializer(appointment)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['post'])
+    def bulk_update_status(self, request):
+        """Update the status of many of the doctor's appointments at once (for doctors)."""
+        if request.user.user_type != 'doctor':
+            return Response(
+                {'error': 'Only doctors can update appointment status'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        try:
+            doctor = Doctor.objects.get(user=request.user)
+        except Doctor.DoesNotExist:
+            return Response(
+                {'error': 'Doctor profile not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        serializer = BulkStatusUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = bulk_update_status(doctor, serializer.validated_data['updates'])
+        return Response({
+            'updated': sum(1 for result in results if result['result'] == 'updated'),
+            'results': results,
+        })
+    
     @action(detail=False, methods=['get'])
     def upcoming(self, request):
-        """Get upcoming appointments."""
+        """Get upcoming appointments, soonest first, one keyset page at a time."""
         queryset = self.get_queryset().filter(
             appointment_date__gte=timezone.now().date(),
-            status__in=['pending', 'confirmed']
+            status__in=Appointment.ACTIVE_STATUSES
         )
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        paginator = KeysetPagination(ordering=('appointment_date', 'appointment_time', 'id'))
+        return self.get_feed_response(queryset, paginator)
     
     @action(detail=False, methods=['get'])
     def past(self, request):
-        """Get past appointments."""
-        queryset = self.get_queryset().filter(
-            appointment_date__lt=timezone.now().date()
-        ) | self.get_queryset().filter(status__in=['completed', 'cancelled'])
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        """
+        Get past appointments, most recent first, one keyset page at a time.
+        
+        Everything not in the upcoming feed is history, including cancelled
+        or closed appointments dated today or later.
+        """
+        queryset = self.get_queryset().exclude(
+            appointment_date__gte=timezone.now().date(),
+            status__in=Appointment.ACTIVE_STATUSES
+        )
+        paginator = KeysetPagination(ordering=('-appointment_date', '-appointment_time', '-id'))
+        return self.get_feed_response(queryset, paginator)
+    
+    def get_feed_response(self, queryset, paginator):
+        queryset = AppointmentSerializer.setup_eager_loading(queryset)
+        page = paginator.paginate_queryset(queryset, self.request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
 
+class WaitlistViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin,
+                      mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """Waitlist viewset: patients queue for a fully booked doctor."""
+    serializer_class = WaitlistEntrySerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        """Patients see their own entries, doctors the queue for them."""
+        user = self.request.user
+        queryset = WaitlistEntry.objects.select_related('doctor__user').prefetch_related(
+            'doctor__specialization'
+        )
+        if user.user_type == 'patient':
+            return queryset.filter(patient__user=user)
+        elif user.user_type == 'doctor':
+            return queryset.filter(doctor__user=user)
+        elif user.user_type == 'admin':
+            return queryset
+        return WaitlistEntry.objects.none()
+    
+    def create(self, request, *args, **kwargs):
+        """Join the waitlist for a doctor and date range."""
+        if request.user.user_type != 'patient':
+            return Response(
+                {'error': 'Only patients can join a waitlist'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            patient = Patient.objects.get(user=request.user)
+        except Patient.DoesNotExist:
+            patient = Patient.objects.create(user=request.user)
+        
+        already_waiting = WaitlistEntry.objects.filter(
+            patient=patient,
+            doctor=serializer.validated_data['doctor'],
+            status__in=['waiting', 'offered']
+        ).exists()
+        if already_waiting:
+            return Response(
+                {'error': 'You are already on the waitlist for this doctor'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        serializer.save(patient=patient)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+    
+    def destroy(self, request, *args, **kwargs):
+        """Leave the waitlist; an open offer passes to the next patient."""
+        entry = self.get_object()
+        if entry.patient.user_id != request.user.id:
+            return Response(
+                {'error': 'Permission denied'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        if not waitlist.leave(entry):
+            return Response(
+                {'error': f'Cannot leave a waitlist entry with status: {entry.status}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(self.get_serializer(entry).data)
@@ -0,0 +1,125 @@
+"""
+Waitlist matching for fully booked doctors.
+
+Patients queue for a doctor and a date range. When an appointment frees
+its slot (see services.release_slots), the slot is offered to the
+earliest waiting entry whose range covers its date: the slot is held for
+that patient for WAITLIST_OFFER_MINUTES and they book it through
+confirm_hold with the offer's hold id. Matching only runs when a slot is freed and reads the
+partial index of waiting entries, so nothing scans or polls.
+"""
+from datetime import datetime
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import holds
+from .models import Appointment, WaitlistEntry
+
+# Waiting entries tried per freed slot when earlier ones lose a race
+MATCH_CANDIDATES = 5
+
+
+def get_offer_minutes():
+    """Minutes a waitlisted patient has to take an offered slot."""
+    return getattr(settings, 'WAITLIST_OFFER_MINUTES', 15)
+
+
+def notify_offer(entry):
+    from apps.notifications.models import Notification
+    Notification.objects.create(
+        user_id=entry.patient.user_id,
+        title='A slot opened up',
+        message=(f"Dr. {entry.doctor.user.full_name} has a free slot on "
+                 f"{entry.offered_date:%Y-%m-%d} at {entry.offered_time:%H:%M}. "
+                 f"It is held for you until {timezone.localtime(entry.offer_expires_at):%H:%M}."),
+        notification_type='waitlist_offer'
+    )
+
+
+def offer_slot(doctor_id, date, slot_time):
+    """
+    Offer a freed slot to the first matching waiting patient.
+    
+    Returns the offered entry, or None when nobody is waiting, the slot is
+    in the past, or it has already been booked or held again.
+    """
+    now = timezone.localtime()
+    if datetime.combine(date, slot_time) <= now.replace(tzinfo=None):
+        return None
+    booked = Appointment.objects.filter(
+        doctor_id=doctor_id,
+        appointment_date=date,
+        appointment_time=slot_time,
+        status__in=Appointment.ACTIVE_STATUSES
+    ).exists()
+    if booked:
+        return None
+    
+    candidates = WaitlistEntry.objects.filter(
+        doctor_id=doctor_id,
+        status='waiting',
+        start_date__lte=date,
+        end_date__gte=date
+    ).select_related('patient', 'doctor__user').order_by('created_at', 'id')[:MATCH_CANDIDATES]
+    
+    for entry in candidates:
+        hold = holds.hold_slot(doctor_id, date, slot_time, entry.patient_id, get_offer_minutes())
+        if hold is None:
+            # Another patient is already checking out this slot
+            return None
+        
+        # Claim the entry only if no concurrent offer took it first
+        expires_at = datetime.fromisoformat(hold['expires_at'])
+        claimed = WaitlistEntry.objects.filter(pk=entry.pk, status='waiting').update(
+            status='offered',
+            offered_date=date,
+            offered_time=slot_time,
+            hold_id=hold['hold_id'],
+            offer_expires_at=expires_at,
+            updated_at=timezone.now()
+        )
+        if claimed:
+            entry.status = 'offered'
+            entry.offered_date = date
+            entry.offered_time = slot_time
+            entry.hold_id = hold['hold_id']
+            entry.offer_expires_at = expires_at
+            notify_offer(entry)
+            return entry
+        holds.release_hold(hold['hold_id'])
+    return None
+
+
+def mark_booked(hold_id):
+    """Close the waitlist offer behind a hold once the patient books it."""
+    WaitlistEntry.objects.filter(hold_id=hold_id, status='offered').update(
+        status='booked', updated_at=timezone.now()
+    )
+
+
+def leave(entry):
+    """Take a patient off the waitlist, passing an open offer on to the next patient."""
+    if not WaitlistEntry.objects.filter(pk=entry.pk, status__in=['waiting', 'offered']).update(
+        status='cancelled', updated_at=timezone.now()
+    ):
+        return False
+    if entry.status == 'offered':
+        holds.release_hold(entry.hold_id)
+        offer_slot(entry.doctor_id, entry.offered_date, entry.offered_time)
+    entry.status = 'cancelled'
+    return True
+
+
+def expire_offers():
+    """Expire offers whose hold window has passed and offer their slots to the next patient."""
+    now = timezone.now()
+    expired = WaitlistEntry.objects.filter(status='offered', offer_expires_at__lte=now).values_list(
+        'id', 'doctor_id', 'offered_date', 'offered_time'
+    )
+    count = 0
+    for entry_id, doctor_id, date, slot_time in list(expired):
+        if WaitlistEntry.objects.filter(pk=entry_id, status='offered').update(status='expired', updated_at=now):
+            count += 1
+            offer_slot(doctor_id, date, slot_time)
+    return count
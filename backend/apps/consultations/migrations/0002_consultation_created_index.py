@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0005_appointment_indexes'),
+        ('consultations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='consultation',
+            index=models.Index(fields=['-created_at'], name='consultations_created_idx'),
+        ),
+    ]
@@ -15,6 +15,9 @@ class Consultation(models.Model):
     class Meta:
         db_table = 'consultations'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='consultations_created_idx'),
+        ]
     
     def __str__(self):
         return f"Consultation for {self.appointment}"
@@ -6,6 +6,7 @@ from .models import Consultation
 from .serializers import ConsultationSerializer
 from apps.appointments.models import Appointment
 from apps.doctors.models import Doctor
+from core.pagination import SwitchablePagination
 
 
 class ConsultationViewSet(viewsets.ModelViewSet):
@@ -13,6 +14,8 @@ class ConsultationViewSet(viewsets.ModelViewSet):
     queryset = Consultation.objects.all()
     serializer_class = ConsultationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = SwitchablePagination
+    keyset_ordering = ('-created_at', '-id')
     
     def get_queryset(self):
         """Filter consultations based on user type."""
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Doctor, Specialty, Schedule, Review
+from .models import Doctor, Specialty, Schedule, DoctorSlot, Review
 
 
 @admin.register(Specialty)
@@ -22,6 +22,12 @@ class ScheduleAdmin(admin.ModelAdmin):
     list_filter = ['day_of_week', 'is_available']
 
 
+@admin.register(DoctorSlot)
+class DoctorSlotAdmin(admin.ModelAdmin):
+    list_display = ['doctor', 'date', 'time', 'state', 'updated_at']
+    list_filter = ['state', 'date']
+
+
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
     list_display = ['patient', 'doctor', 'rating', 'created_at']
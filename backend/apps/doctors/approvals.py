@@ -0,0 +1,54 @@
+"""
+Review of pending doctor registrations.
+"""
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Doctor
+from .signals import refresh_doctors
+
+# Sent after doctors are approved with QuerySet.update(). `doctor_ids` lists
+# the approved doctors and `approved_at` is the approval time they share.
+doctors_approved = Signal()
+
+# Upper bound for one bulk review request
+MAX_BATCH_SIZE = 1000
+
+
+def get_pending_doctors():
+    """Doctors waiting for review, oldest registration first."""
+    return Doctor.objects.filter(is_approved=False, is_active=True).order_by('created_at', 'id')
+
+
+def review_doctors(doctor_ids, approve=True):
+    """
+    Approve or reject many pending doctors in one transaction.
+
+    Rejecting deactivates pending doctors, which takes them out of the queue.
+    Approving also applies to rejected doctors and reactivates them. Other
+    doctors are left alone. The change is one UPDATE, after which the search
+    and autocomplete indexes are refreshed for the changed doctors. Returns
+    their ids.
+    """
+    if approve:
+        candidates = Doctor.objects.filter(is_approved=False)
+    else:
+        candidates = get_pending_doctors()
+
+    now = timezone.now()
+    with transaction.atomic():
+        changed = list(candidates.select_for_update().filter(
+            id__in=doctor_ids
+        ).values_list('id', flat=True))
+        if not changed:
+            return []
+        if approve:
+            fields = {'is_approved': True, 'is_active': True, 'approved_at': now}
+        else:
+            fields = {'is_active': False}
+        Doctor.objects.filter(id__in=changed).update(updated_at=now, **fields)
+        refresh_doctors(changed)
+        if approve:
+            doctors_approved.send(sender=Doctor, doctor_ids=changed, approved_at=now)
+    return changed
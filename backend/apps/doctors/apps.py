@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class DoctorsConfig(AppConfig):
+    name = 'apps.doctors'
+    label = 'doctors'
+
+    def ready(self):
+        from . import signals  # noqa: F401
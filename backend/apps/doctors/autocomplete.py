@@ -0,0 +1,253 @@
+"""
+In-process prefix index for as-you-type suggestions.
+
+Doctor names, specialty names and clinic cities are kept in one sorted
+array of normalized keys per kind, so a lookup is a binary search plus a
+short scan and never touches the database. The index is built on first
+use, updated incrementally from model signals, and rebuilt periodically so
+processes that did not see a change still converge. Rebuilds are prepared
+outside the index lock and swapped in at once, so lookups never wait on one.
+"""
+import time
+import threading
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+
+KINDS = ('doctor', 'specialty', 'city')
+
+
+def normalize(text):
+    """Lowercase text and collapse whitespace."""
+    return ' '.join(text.lower().split())
+
+
+def get_keys(label):
+    """Index a label under every word-aligned suffix, e.g. 'ravi kumar' and 'kumar'."""
+    words = normalize(label).split()
+    return [' '.join(words[index:]) for index in range(len(words))]
+
+
+class PrefixIndex:
+    """Sorted-array prefix index of suggestion items."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            # Kind -> sorted (key, ident) tuples
+            self._keys = {kind: [] for kind in KINDS}
+            # (kind, ident) -> (label, keys)
+            self._items = {}
+            # City ident -> number of doctors in that city
+            self._city_counts = {}
+            # Doctor id -> city ident
+            self._doctor_cities = {}
+            self.built_at = None
+
+    def load(self, doctors, specialties):
+        """
+        Replace the contents with (id, name, city) doctors and (id, name) specialties.
+
+        The new arrays are filled and sorted once without holding the lock,
+        then swapped in together.
+        """
+        keys = {kind: [] for kind in KINDS}
+        items = {}
+        city_counts = {}
+        doctor_cities = {}
+
+        def add(kind, ident, label):
+            item_keys = get_keys(label)
+            keys[kind].extend((key, ident) for key in item_keys)
+            items[(kind, ident)] = (label, item_keys)
+
+        for doctor_id, name, city in doctors:
+            add('doctor', doctor_id, name)
+            city_ident = normalize(city)
+            if city_ident:
+                doctor_cities[doctor_id] = city_ident
+                city_counts[city_ident] = city_counts.get(city_ident, 0) + 1
+                if city_counts[city_ident] == 1:
+                    add('city', city_ident, city.strip())
+        for specialty_id, name in specialties:
+            add('specialty', specialty_id, name)
+        for kind_keys in keys.values():
+            kind_keys.sort()
+
+        with self._lock:
+            self._keys, self._items = keys, items
+            self._city_counts, self._doctor_cities = city_counts, doctor_cities
+            self.built_at = time.monotonic()
+
+    def add(self, kind, ident, label):
+        """Add or replace an item."""
+        with self._lock:
+            self.remove(kind, ident)
+            keys = get_keys(label)
+            for key in keys:
+                insort(self._keys[kind], (key, ident))
+            self._items[(kind, ident)] = (label, keys)
+
+    def remove(self, kind, ident):
+        """Remove an item if present."""
+        with self._lock:
+            item = self._items.pop((kind, ident), None)
+            if item is None:
+                return
+            kind_keys = self._keys[kind]
+            for key in item[1]:
+                position = bisect_left(kind_keys, (key, ident))
+                if position < len(kind_keys) and kind_keys[position] == (key, ident):
+                    del kind_keys[position]
+
+    def set_doctor(self, doctor_id, name, city):
+        """Add or replace a doctor and keep the city reference counts in step."""
+        with self._lock:
+            self.add('doctor', doctor_id, name)
+            city_ident = normalize(city)
+            old_city = self._doctor_cities.get(doctor_id)
+            if old_city == city_ident:
+                return
+            self.remove_doctor_city(doctor_id)
+            if city_ident:
+                self._doctor_cities[doctor_id] = city_ident
+                self._city_counts[city_ident] = self._city_counts.get(city_ident, 0) + 1
+                if self._city_counts[city_ident] == 1:
+                    self.add('city', city_ident, city.strip())
+
+    def remove_doctor(self, doctor_id):
+        with self._lock:
+            self.remove('doctor', doctor_id)
+            self.remove_doctor_city(doctor_id)
+
+    def remove_doctor_city(self, doctor_id):
+        city_ident = self._doctor_cities.pop(doctor_id, None)
+        if city_ident is None:
+            return
+        self._city_counts[city_ident] -= 1
+        if not self._city_counts[city_ident]:
+            del self._city_counts[city_ident]
+            self.remove('city', city_ident)
+
+    def lookup(self, prefix, limit=5):
+        """Return up to `limit` suggestions of each kind whose keys start with prefix."""
+        prefix = normalize(prefix)
+        results = {kind: [] for kind in KINDS}
+        if not prefix:
+            return results
+        with self._lock:
+            for kind, items in results.items():
+                kind_keys = self._keys[kind]
+                seen = set()
+                # Each kind is scanned until it is full or its prefix range ends
+                position = bisect_left(kind_keys, (prefix,))
+                while len(items) < limit and position < len(kind_keys):
+                    key, ident = kind_keys[position]
+                    if not key.startswith(prefix):
+                        break
+                    position += 1
+                    if ident not in seen:
+                        seen.add(ident)
+                        items.append((ident, self._items[(kind, ident)][0]))
+        return results
+
+
+index = PrefixIndex()
+
+
+def get_rebuild_interval():
+    """Seconds after which the index is rebuilt from the database."""
+    return getattr(settings, 'AUTOCOMPLETE_REBUILD_SECONDS', 300)
+
+
+def load_doctors(queryset):
+    """Load (id, name, city) of doctors that are visible in the directory."""
+    from .models import Doctor
+
+    through = Doctor.specialization.through
+    visible = queryset.filter(is_approved=True).filter(
+        Exists(through.objects.filter(doctor_id=OuterRef('pk')))
+    )
+    return [
+        (doctor_id, f'{first_name} {last_name}', city)
+        for doctor_id, first_name, last_name, city in visible.values_list(
+            'id', 'user__first_name', 'user__last_name', 'clinic_city'
+        )
+    ]
+
+
+def build():
+    """Build the index from the database."""
+    from .models import Doctor, Specialty
+
+    doctors = load_doctors(Doctor.objects.all())
+    specialties = list(Specialty.objects.values_list('id', 'name'))
+    index.load(doctors, specialties)
+
+
+# Held by the one thread building the index
+build_lock = threading.Lock()
+
+
+def ensure_built():
+    """
+    Build the index on first use and rebuild it once it is too old.
+
+    Only the first build makes callers wait. While a stale index is being
+    rebuilt by one thread, the others keep answering from the old one.
+    """
+    if index.built_at is None:
+        with build_lock:
+            if index.built_at is None:
+                build()
+    elif time.monotonic() - index.built_at > get_rebuild_interval():
+        if build_lock.acquire(blocking=False):
+            try:
+                build()
+            finally:
+                build_lock.release()
+
+
+def refresh_doctors(doctor_ids):
+    """Re-read doctors from the database and update their suggestions."""
+    from .models import Doctor
+
+    if index.built_at is None:
+        return
+    doctor_ids = set(doctor_ids)
+    visible = load_doctors(Doctor.objects.filter(id__in=doctor_ids))
+    with index._lock:
+        for doctor_id, name, city in visible:
+            index.set_doctor(doctor_id, name, city)
+        for doctor_id in doctor_ids - {doctor_id for doctor_id, _, _ in visible}:
+            index.remove_doctor(doctor_id)
+
+
+def refresh_specialty(specialty):
+    if index.built_at is not None:
+        index.add('specialty', specialty.pk, specialty.name)
+
+
+def remove_doctor(doctor_id):
+    if index.built_at is not None:
+        index.remove_doctor(doctor_id)
+
+
+def remove_specialty(specialty_id):
+    if index.built_at is not None:
+        index.remove('specialty', specialty_id)
+
+
+def suggest(prefix, limit=5):
+    """Get doctor, specialty and city suggestions for a prefix."""
+    ensure_built()
+    results = index.lookup(prefix, limit)
+    return {
+        'doctors': [{'id': ident, 'name': label} for ident, label in results['doctor']],
+        'specialties': [{'id': ident, 'name': label} for ident, label in results['specialty']],
+        'cities': [label for _, label in results['city']],
+    }
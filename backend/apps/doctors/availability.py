@@ -0,0 +1,239 @@
+"""
+Slot computation engine for doctor availability.
+"""
+import heapq
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from .models import Schedule, DoctorSlot
+from apps.appointments import holds
+from apps.appointments.models import Appointment
+
+# Used when a doctor has no schedule for the requested day
+DEFAULT_START_TIME = time(9, 0)
+DEFAULT_END_TIME = time(17, 0)
+DEFAULT_SLOT_DURATION = 30  # in minutes
+
+# Upper bound for multi-day availability requests
+MAX_RANGE_DAYS = 62
+
+
+def generate_slot_times(date, start_time, end_time, slot_duration):
+    """Return the slot start times that fit between start_time and end_time."""
+    slots = []
+    current_time = datetime.combine(date, start_time)
+    end = datetime.combine(date, end_time)
+    duration = timedelta(minutes=slot_duration)
+
+    while current_time + duration <= end:
+        slots.append(current_time.time())
+        current_time += duration
+    return slots
+
+
+def get_slot_times(date, schedule=None):
+    """Return all slot times for a date, using the default window without a schedule."""
+    if schedule is None:
+        return generate_slot_times(date, DEFAULT_START_TIME, DEFAULT_END_TIME,
+                                   DEFAULT_SLOT_DURATION)
+    return generate_slot_times(date, schedule.start_time, schedule.end_time,
+                               schedule.slot_duration)
+
+
+def get_schedule(doctor, date):
+    """Get the doctor's available schedule for the day of week of a date."""
+    return Schedule.objects.filter(
+        doctor=doctor,
+        day_of_week=date.weekday(),
+        is_available=True
+    ).first()
+
+
+def get_booked_times(doctor, date):
+    """Load the booked appointment times for a doctor on a date in one query."""
+    return set(Appointment.objects.filter(
+        doctor=doctor,
+        appointment_date=date,
+        status__in=Appointment.ACTIVE_STATUSES
+    ).values_list('appointment_time', flat=True))
+
+
+def get_free_slots(date, schedule, booked_times):
+    """Get the free slot times (HH:MM) for a date given its schedule and booked times."""
+    slot_times = get_slot_times(date, schedule)
+    return [slot.strftime('%H:%M') for slot in slot_times if slot not in booked_times]
+
+
+def load_schedules(doctor):
+    """Load the doctor's available schedules keyed by day of week."""
+    return {
+        schedule.day_of_week: schedule
+        for schedule in Schedule.objects.filter(doctor=doctor, is_available=True)
+    }
+
+
+def load_booked_times(doctor, start_date, end_date):
+    """Load booked appointment times between two dates, keyed by date."""
+    booked = defaultdict(set)
+    appointments = Appointment.objects.filter(
+        doctor=doctor,
+        appointment_date__range=(start_date, end_date),
+        status__in=Appointment.ACTIVE_STATUSES
+    ).values_list('appointment_date', 'appointment_time')
+    for appointment_date, appointment_time in appointments:
+        booked[appointment_date].add(appointment_time)
+    return booked
+
+
+def load_inventory(doctor, start_date, end_date):
+    """
+    Read free slots from the materialized inventory between two dates.
+
+    Returns free slot times (HH:MM) keyed by date. Dates that have not been
+    generated into the inventory are missing from the result.
+    """
+    inventory = {}
+    rows = DoctorSlot.objects.filter(
+        doctor=doctor,
+        date__range=(start_date, end_date)
+    ).order_by('date', 'time').values_list('date', 'time', 'state')
+    for date, slot_time, state in rows:
+        free_slots = inventory.setdefault(date, [])
+        if state == 'available':
+            free_slots.append(slot_time.strftime('%H:%M'))
+    return inventory
+
+
+def exclude_held(doctor, date, free_slots):
+    """Drop slots that another patient is holding during checkout."""
+    held = holds.get_held_slots(doctor.pk, [(date, slot) for slot in free_slots])
+    if not held:
+        return free_slots
+    return [slot for slot in free_slots if (date, slot) not in held]
+
+
+def get_available_slots(doctor, date):
+    """Get the free, unheld slot times (HH:MM) for a doctor on a date."""
+    inventory = load_inventory(doctor, date, date)
+    if date in inventory:
+        free_slots = inventory[date]
+    else:
+        free_slots = get_free_slots(date, get_schedule(doctor, date), get_booked_times(doctor, date))
+    return exclude_held(doctor, date, free_slots)
+
+
+def get_availability_range(doctor, start_date, end_date):
+    """
+    Get per-day free slots for a doctor between two dates (inclusive).
+
+    Reads the slot inventory first and computes any days it does not cover
+    from schedules and appointments loaded up front, so the number of
+    queries does not depend on the number of days. Held slots are looked
+    up for the whole range at once.
+    """
+    inventory = load_inventory(doctor, start_date, end_date)
+    schedules = booked = None
+
+    free_by_date = {}
+    date = start_date
+    while date <= end_date:
+        if date in inventory:
+            free_by_date[date] = inventory[date]
+        else:
+            if schedules is None:
+                schedules = load_schedules(doctor)
+                booked = load_booked_times(doctor, start_date, end_date)
+            free_by_date[date] = get_free_slots(date, schedules.get(date.weekday()), booked[date])
+        date += timedelta(days=1)
+
+    held = holds.get_held_slots(doctor.pk, [
+        (date, slot) for date, free_slots in free_by_date.items() for slot in free_slots
+    ])
+
+    days = []
+    for date, free_slots in free_by_date.items():
+        if held:
+            free_slots = [slot for slot in free_slots if (date, slot) not in held]
+        days.append({
+            'date': date.isoformat(),
+            'available_slots': free_slots,
+            'available_count': len(free_slots),
+        })
+    return days
+
+
+def build_occupancy_bitmap(slot_times, booked_times):
+    """Build a bitmap with bit i set when slot_times[i] is booked."""
+    bitmap = 0
+    for index, slot_time in enumerate(slot_times):
+        if slot_time in booked_times:
+            bitmap |= 1 << index
+    return bitmap
+
+
+def first_free_slot(slot_times, occupancy, after_time=None):
+    """Return the earliest slot time not set in the occupancy bitmap, or None."""
+    if after_time is not None:
+        # Treat slots that already started as occupied
+        for index, slot_time in enumerate(slot_times):
+            if slot_time > after_time:
+                break
+            occupancy |= 1 << index
+    free = ~occupancy & ((1 << len(slot_times)) - 1)
+    if not free:
+        return None
+    return slot_times[(free & -free).bit_length() - 1]
+
+
+def find_next_available(doctor_ids, start_date, days, limit, now=None):
+    """
+    Find the earliest free slot for each doctor and return the `limit` earliest.
+
+    Schedules and booked appointments for all doctors are loaded in two
+    queries; each doctor/day is then reduced to an occupancy bitmap over its
+    slot grid. Returns (date, time, doctor_id) tuples ordered by date and time.
+    """
+    doctor_ids = list(doctor_ids)
+    if not doctor_ids:
+        return []
+    end_date = start_date + timedelta(days=days - 1)
+
+    schedules = defaultdict(dict)
+    for schedule in Schedule.objects.filter(doctor_id__in=doctor_ids, is_available=True):
+        schedules[schedule.doctor_id][schedule.day_of_week] = schedule
+
+    booked = defaultdict(lambda: defaultdict(set))
+    appointments = Appointment.objects.filter(
+        doctor_id__in=doctor_ids,
+        appointment_date__range=(start_date, end_date),
+        status__in=Appointment.ACTIVE_STATUSES
+    ).values_list('doctor_id', 'appointment_date', 'appointment_time')
+    for doctor_id, appointment_date, appointment_time in appointments:
+        booked[doctor_id][appointment_date].add(appointment_time)
+
+    # Doctors share slot grids (e.g. the default window), so build each once
+    grids = {}
+
+    def get_grid(schedule):
+        if schedule is None:
+            key = (DEFAULT_START_TIME, DEFAULT_END_TIME, DEFAULT_SLOT_DURATION)
+        else:
+            key = (schedule.start_time, schedule.end_time, schedule.slot_duration)
+        if key not in grids:
+            grids[key] = generate_slot_times(start_date, *key)
+        return grids[key]
+
+    results = []
+    for doctor_id in doctor_ids:
+        date = start_date
+        while date <= end_date:
+            slot_times = get_grid(schedules[doctor_id].get(date.weekday()))
+            occupancy = build_occupancy_bitmap(slot_times, booked[doctor_id][date])
+            after_time = now.time() if now is not None and date == now.date() else None
+            slot_time = first_free_slot(slot_times, occupancy, after_time)
+            if slot_time is not None:
+                results.append((date, slot_time, doctor_id))
+                break
+            date += timedelta(days=1)
+
+    return heapq.nsmallest(limit, results)
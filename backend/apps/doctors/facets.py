@@ -0,0 +1,64 @@
+"""
+Facet counts for the doctor directory.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Doctor
+
+# Plain doctor columns counted with one grouped query each
+FACET_FIELDS = ['online_consultation_available', 'clinic_city', 'clinic_state']
+
+# Query parameters that do not change which doctors match
+IGNORED_PARAMS = {'page', 'page_size', 'ordering', 'facets', 'cursor', 'pagination'}
+
+
+def get_cache_key(query_params):
+    """Cache key for a filter combination, independent of parameter order."""
+    items = sorted(
+        (key, value)
+        for key in query_params
+        if key not in IGNORED_PARAMS
+        for value in query_params.getlist(key)
+    )
+    digest = hashlib.md5(repr(items).encode()).hexdigest()
+    return f'doctor-facets:{digest}'
+
+
+def compute_facet_counts(queryset):
+    """Count matching doctors per facet value with one grouped query per facet."""
+    doctor_ids = queryset.order_by().values('pk')
+    facets = {}
+
+    through = Doctor.specialization.through
+    specializations = through.objects.filter(doctor_id__in=doctor_ids).values(
+        'specialty_id', 'specialty__name'
+    ).annotate(count=Count('doctor_id')).order_by('-count', 'specialty__name')
+    facets['specialization'] = [
+        {'id': row['specialty_id'], 'name': row['specialty__name'], 'count': row['count']}
+        for row in specializations
+    ]
+
+    for field in FACET_FIELDS:
+        rows = Doctor.objects.filter(pk__in=doctor_ids).values(field).annotate(
+            count=Count('pk')
+        ).order_by('-count', field)
+        facets[field] = [
+            {'value': row[field], 'count': row['count']}
+            for row in rows
+            if row[field] != ''
+        ]
+    return facets
+
+
+def get_facet_counts(queryset, query_params):
+    """Get facet counts for a filtered queryset, cached per filter combination."""
+    cache_key = get_cache_key(query_params)
+    facets = cache.get(cache_key)
+    if facets is None:
+        facets = compute_facet_counts(queryset)
+        cache.set(cache_key, facets, getattr(settings, 'FACET_CACHE_SECONDS', 60))
+    return facets
@@ -0,0 +1,98 @@
+"""
+Doctor directory filters.
+
+Filtering on the specialization many-to-many relation joins the through
+table and needs a DISTINCT over the whole result. These filters express
+the same conditions as EXISTS subqueries so each doctor row is matched at
+most once and no deduplication is required.
+"""
+import operator
+from functools import reduce
+
+import django_filters
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+from .models import Doctor, Specialty
+from .search import search_doctors
+
+
+def specialization_exists(**lookups):
+    """EXISTS subquery over the doctor/specialty through table for the outer doctor."""
+    through = Doctor.specialization.through
+    return Exists(through.objects.filter(doctor_id=OuterRef('pk'), **lookups))
+
+
+class DoctorFilter(django_filters.FilterSet):
+    """Doctor list filters."""
+    specialization = django_filters.ModelMultipleChoiceFilter(
+        queryset=Specialty.objects.all(),
+        method='filter_specialization'
+    )
+    
+    class Meta:
+        model = Doctor
+        fields = ['specialization', 'online_consultation_available',
+                  'clinic_city', 'clinic_state']
+    
+    def filter_specialization(self, queryset, name, value):
+        if not value:
+            return queryset
+        return queryset.filter(specialization_exists(specialty__in=value))
+
+
+class DoctorSearchFilter(filters.SearchFilter):
+    """SearchFilter that matches many-to-many search fields with EXISTS instead of DISTINCT."""
+    
+    def get_condition(self, queryset, search_field, search_term):
+        """Build the match condition of a single search field for a term."""
+        orm_lookup = self.construct_search(str(search_field))
+        name, _, rest = orm_lookup.partition(LOOKUP_SEP)
+        field = queryset.model._meta.get_field(name)
+        if field.many_to_many and not field.auto_created:
+            through = field.remote_field.through
+            return Q(Exists(through.objects.filter(**{
+                field.m2m_field_name(): OuterRef('pk'),
+                f'{field.m2m_reverse_field_name()}{LOOKUP_SEP}{rest}': search_term,
+            })))
+        return Q(**{orm_lookup: search_term})
+    
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        
+        if not search_fields or not search_terms:
+            return queryset
+        
+        conditions = [
+            reduce(operator.or_, [
+                self.get_condition(queryset, search_field, search_term)
+                for search_field in search_fields
+            ])
+            for search_term in search_terms
+        ]
+        return queryset.filter(reduce(operator.and_, conditions))
+
+
+class DoctorFullTextSearchFilter(DoctorSearchFilter):
+    """
+    Search doctors through the full-text index and order results by relevance.
+    
+    Must come after OrderingFilter in `filter_backends` so relevance replaces
+    the default ordering; an explicit `ordering` query parameter still wins.
+    Falls back to DoctorSearchFilter when the database has no search index.
+    """
+    
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+        
+        matches = search_doctors(queryset, search_terms)
+        if matches is None:
+            return super().filter_queryset(request, queryset, view)
+        if request.query_params.get(api_settings.ORDERING_PARAM):
+            return matches
+        return matches.order_by('search_rank', 'pk')
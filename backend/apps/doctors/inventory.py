@@ -0,0 +1,124 @@
+"""
+Maintenance of the materialized doctor slot inventory.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Exists, OuterRef, Q, Value, When
+from django.utils import timezone
+
+from .models import Doctor, DoctorSlot
+from .availability import get_slot_times, load_schedules, load_booked_times
+from apps.appointments.models import Appointment
+
+
+def get_horizon_days():
+    """Number of days ahead the inventory is generated for."""
+    return getattr(settings, 'SLOT_INVENTORY_DAYS', 30)
+
+
+def generate_slots(doctor, start_date=None, days=None):
+    """
+    Rebuild a doctor's slot inventory from their schedule.
+
+    Covers `days` days from `start_date` (today by default) and drops rows
+    that fell behind the start of the horizon. Slots with a pending or
+    confirmed appointment are stored as booked. Returns the number of
+    slots written.
+    """
+    start_date = start_date or timezone.now().date()
+    end_date = start_date + timedelta(days=(days or get_horizon_days()) - 1)
+
+    with transaction.atomic():
+        # One regeneration per doctor at a time; appointments are read under the lock
+        Doctor.objects.select_for_update().get(pk=doctor.pk)
+        schedules = load_schedules(doctor)
+        booked = load_booked_times(doctor, start_date, end_date)
+
+        slots = []
+        date = start_date
+        while date <= end_date:
+            booked_times = booked[date]
+            slot_times = set(get_slot_times(date, schedules.get(date.weekday()))) | booked_times
+            for slot_time in sorted(slot_times):
+                slots.append(DoctorSlot(
+                    doctor=doctor,
+                    date=date,
+                    time=slot_time,
+                    state='booked' if slot_time in booked_times else 'available'
+                ))
+            date += timedelta(days=1)
+
+        DoctorSlot.objects.filter(doctor=doctor, date__lte=end_date).delete()
+        DoctorSlot.objects.bulk_create(slots, batch_size=1000)
+        # Bookings do not take the doctor lock: correct the rows of any that
+        # committed since the appointments were read
+        DoctorSlot.objects.filter(doctor=doctor, date__range=(start_date, end_date)).update(
+            state=get_slot_state()
+        )
+    return len(slots)
+
+
+def generate_all_slots(days=None):
+    """
+    Roll the inventory of every approved doctor forward from today.
+
+    Run daily so the horizon keeps moving and past days are dropped.
+    Returns the number of doctors and of slots written.
+    """
+    doctor_count = slot_count = 0
+    for doctor in Doctor.objects.filter(is_approved=True).iterator():
+        slot_count += generate_slots(doctor, days=days)
+        doctor_count += 1
+    return doctor_count, slot_count
+
+
+def refresh_slot(doctor_id, date, slot_time):
+    """Set an inventory row to booked if any active appointment holds the slot, else available."""
+    active = Appointment.objects.filter(
+        doctor_id=doctor_id,
+        appointment_date=date,
+        appointment_time=slot_time,
+        status__in=Appointment.ACTIVE_STATUSES
+    )
+    DoctorSlot.objects.filter(doctor_id=doctor_id, date=date, time=slot_time).update(
+        state=Case(When(Exists(active), then=Value('booked')), default=Value('available')),
+        updated_at=timezone.now()
+    )
+
+
+def get_slot_state():
+    """Expression for an inventory row's state: booked while an active appointment holds its slot."""
+    active = Appointment.objects.filter(
+        doctor_id=OuterRef('doctor_id'),
+        appointment_date=OuterRef('date'),
+        appointment_time=OuterRef('time'),
+        status__in=Appointment.ACTIVE_STATUSES
+    )
+    return Case(When(Exists(active), then=Value('booked')), default=Value('available'))
+
+
+def refresh_slots(slots):
+    """Refresh the inventory rows of many (doctor_id, date, time) slots with one UPDATE."""
+    slots = set(slots)
+    if not slots:
+        return
+    condition = Q()
+    for doctor_id, date, slot_time in slots:
+        condition |= Q(doctor_id=doctor_id, date=date, time=slot_time)
+    DoctorSlot.objects.filter(condition).update(state=get_slot_state(), updated_at=timezone.now())
+
+
+def sync_slot(appointment):
+    """Update the inventory row of an appointment's slot to match its status."""
+    if appointment.status in Appointment.ACTIVE_STATUSES:
+        DoctorSlot.objects.filter(
+            doctor_id=appointment.doctor_id,
+            date=appointment.appointment_date,
+            time=appointment.appointment_time
+        ).update(state='booked', updated_at=timezone.now())
+    else:
+        # Another active appointment may have rebooked the slot
+        refresh_slot(appointment.doctor_id, appointment.appointment_date,
+                     appointment.appointment_time)
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from apps.doctors.models import Doctor
 from apps.users.models import User
+from apps.doctors.approvals import review_doctors
 
 
 class Command(BaseCommand):
@@ -17,8 +18,7 @@ class Command(BaseCommand):
             if doctor.is_approved:
                 self.stdout.write(self.style.WARNING(f'Doctor {user.full_name} is already approved.'))
             else:
-                doctor.is_approved = True
-                doctor.save()
+                review_doctors([doctor.id])
                 self.stdout.write(self.style.SUCCESS(f'SUCCESS: Doctor {user.full_name} has been approved!'))
         except User.DoesNotExist:
             self.stdout.write(self.style.ERROR(f'ERROR: No doctor found with email: {email}'))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from apps.doctors.models import Doctor
+from apps.doctors.inventory import generate_all_slots, generate_slots, get_horizon_days
+
+
+class Command(BaseCommand):
+    help = 'Regenerate the slot inventory from doctor schedules for a rolling horizon'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', type=str, help='Only regenerate slots for this doctor')
+        parser.add_argument('--days', type=int, default=None,
+                            help=f'Number of days ahead to generate (default {get_horizon_days()})')
+
+    def handle(self, *args, **options):
+        email = options['email']
+        days = options['days']
+
+        if email:
+            doctor = Doctor.objects.filter(user__email=email).first()
+            if doctor is None:
+                self.stdout.write(self.style.ERROR(f'ERROR: Doctor profile not found for user: {email}'))
+                return
+            doctor_count, slot_count = 1, generate_slots(doctor, days=days)
+        else:
+            doctor_count, slot_count = generate_all_slots(days=days)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'SUCCESS: Generated {slot_count} slots for {doctor_count} doctors'
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from apps.doctors.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the doctor full-text search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Doctors indexed per batch')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            self.stdout.write(self.style.WARNING(
+                f'Full-text search is not supported on {connection.vendor}; nothing to do.'
+            ))
+            return
+
+        count = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'SUCCESS: Indexed {count} doctors'))
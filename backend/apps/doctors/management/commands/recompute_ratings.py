@@ -0,0 +1,49 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Sum
+from apps.doctors.models import Doctor, Review
+
+
+class Command(BaseCommand):
+    help = 'Rebuild doctor ratings, rating sums and review counts from all reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Doctors updated per batch')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        totals = Review.objects.values('doctor_id').annotate(
+            rating_sum=Sum('rating'), total_reviews=Count('id')
+        ).order_by('doctor_id')
+
+        updated = 0
+        batch = []
+        for row in totals.iterator(chunk_size=batch_size):
+            batch.append(Doctor(
+                pk=row['doctor_id'],
+                rating_sum=row['rating_sum'],
+                total_reviews=row['total_reviews'],
+                rating=round(Decimal(row['rating_sum']) / row['total_reviews'], 2),
+            ))
+            if len(batch) >= batch_size:
+                updated += self.write_batch(batch)
+                batch = []
+        if batch:
+            updated += self.write_batch(batch)
+
+        reset = Doctor.objects.filter(
+            ~Exists(Review.objects.filter(doctor_id=OuterRef('pk')))
+        ).exclude(total_reviews=0, rating_sum=0, rating=0).update(
+            rating=Decimal('0.00'), rating_sum=0, total_reviews=0
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'SUCCESS: Recomputed ratings for {updated} doctors, reset {reset} without reviews'
+        ))
+
+    def write_batch(self, batch):
+        with transaction.atomic():
+            Doctor.objects.bulk_update(batch, ['rating_sum', 'total_reviews', 'rating'])
+        return len(batch)
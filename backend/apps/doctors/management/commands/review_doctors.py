@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from apps.doctors.models import Doctor
+from apps.doctors.approvals import review_doctors
+
+
+class Command(BaseCommand):
+    help = 'Approve or reject many pending doctors at once, by id or email'
+
+    def add_arguments(self, parser):
+        parser.add_argument('doctors', nargs='*', help='Doctor ids or email addresses')
+        parser.add_argument('--file', type=str, help='File with one doctor id or email per line')
+        parser.add_argument('--reject', action='store_true', help='Reject instead of approving')
+
+    def handle(self, *args, **options):
+        identifiers = list(options['doctors'])
+        if options['file']:
+            try:
+                with open(options['file']) as lines:
+                    identifiers.extend(line.strip() for line in lines if line.strip())
+            except OSError as e:
+                self.stdout.write(self.style.ERROR(f'ERROR: {e}'))
+                return
+        if not identifiers:
+            self.stdout.write(self.style.ERROR('ERROR: No doctors given'))
+            return
+
+        doctor_ids = {int(value) for value in identifiers if value.isdigit()}
+        emails = {value for value in identifiers if not value.isdigit()}
+        if emails:
+            found = dict(Doctor.objects.filter(user__email__in=emails).values_list('user__email', 'id'))
+            for email in sorted(emails - set(found)):
+                self.stdout.write(self.style.WARNING(f'Doctor profile not found for user: {email}'))
+            doctor_ids.update(found.values())
+
+        changed = review_doctors(doctor_ids, approve=not options['reject'])
+        action = 'Rejected' if options['reject'] else 'Approved'
+        self.stdout.write(self.style.SUCCESS(
+            f'SUCCESS: {action} {len(changed)} doctors, skipped {len(doctor_ids) - len(changed)}'
+        ))
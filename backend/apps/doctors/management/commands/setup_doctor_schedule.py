@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from apps.doctors.models import Doctor, Schedule
+from apps.doctors.inventory import generate_slots
 from apps.users.models import User
 from datetime import time
 
@@ -57,6 +58,8 @@ class Command(BaseCommand):
                         updated_count += 1
                         self.stdout.write(f'Updated schedule for {day_names[day_of_week]}')
             
+            slot_count = generate_slots(doctor)
+            
             self.stdout.write(self.style.SUCCESS(
                 f'\nSUCCESS: Setup schedule for {user.full_name}'
             ))
@@ -64,6 +67,7 @@ class Command(BaseCommand):
             self.stdout.write(f'Updated: {updated_count} schedules')
             self.stdout.write(f'Time: {start_time_str} - {end_time_str}')
             self.stdout.write(f'Slot Duration: {slot_duration} minutes')
+            self.stdout.write(f'Generated: {slot_count} slots')
             self.stdout.write(f'\nDoctor can now receive appointments!')
             
         except User.DoesNotExist:
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0004_doctor_is_active_doctor_profile_photo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DoctorSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('time', models.TimeField()),
+                ('state', models.CharField(choices=[('available', 'Available'), ('booked', 'Booked')], default='available', max_length=20)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='doctors.doctor')),
+            ],
+            options={
+                'db_table': 'doctor_slots',
+                'ordering': ['doctor', 'date', 'time'],
+                'unique_together': {('doctor', 'date', 'time')},
+            },
+        ),
+    ]
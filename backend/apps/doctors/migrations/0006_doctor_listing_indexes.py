@@ -0,0 +1,25 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0005_doctorslot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='doctor',
+            index=models.Index(fields=['is_approved', '-rating', '-created_at'], name='doctors_approved_rating_idx'),
+        ),
+        # Serves specialization lookups that start from the specialty side
+        migrations.RunSQL(
+            sql='CREATE INDEX doctors_specialization_specialty_doctor_idx '
+                'ON doctors_specialization (specialty_id, doctor_id)',
+            reverse_sql='DROP INDEX doctors_specialization_specialty_doctor_idx',
+        ),
+    ]
@@ -0,0 +1,51 @@
+from collections import defaultdict
+
+from django.db import migrations
+
+from apps.doctors.search import BACKENDS
+
+
+def create_search_index(apps, schema_editor):
+    backend_class = BACKENDS.get(schema_editor.connection.vendor)
+    if backend_class is None:
+        return
+    backend = backend_class()
+    Doctor = apps.get_model('doctors', 'Doctor')
+    
+    specialties = defaultdict(list)
+    through = Doctor.specialization.through.objects.using(schema_editor.connection.alias)
+    for doctor_id, name in through.values_list('doctor_id', 'specialty__name'):
+        specialties[doctor_id].append(name)
+    
+    doctors = Doctor.objects.using(schema_editor.connection.alias).values_list(
+        'id', 'user__first_name', 'user__last_name', 'clinic_city', 'clinic_state'
+    )
+    documents = [
+        (doctor_id, f'{first_name} {last_name}', ' '.join(specialties[doctor_id]),
+         f'{city} {state}')
+        for doctor_id, first_name, last_name, city, state in doctors
+    ]
+    
+    with schema_editor.connection.cursor() as cursor:
+        backend.create(cursor)
+        if documents:
+            backend.write(cursor, documents)
+
+
+def drop_search_index(apps, schema_editor):
+    backend_class = BACKENDS.get(schema_editor.connection.vendor)
+    if backend_class is None:
+        return
+    with schema_editor.connection.cursor() as cursor:
+        backend_class().drop(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0006_doctor_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
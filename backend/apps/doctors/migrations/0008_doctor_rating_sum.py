@@ -0,0 +1,28 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:24
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def populate_rating_sum(apps, schema_editor):
+    Doctor = apps.get_model('doctors', 'Doctor')
+    Review = apps.get_model('doctors', 'Review')
+    totals = Review.objects.values('doctor_id').annotate(rating_sum=Sum('rating'))
+    for row in totals:
+        Doctor.objects.filter(pk=row['doctor_id']).update(rating_sum=row['rating_sum'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0007_doctor_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doctor',
+            name='rating_sum',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(populate_rating_sum, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:39
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_approved_at(apps, schema_editor):
+    # The last update is the best available guess for existing approvals
+    Doctor = apps.get_model('doctors', 'Doctor')
+    Doctor.objects.filter(is_approved=True).update(approved_at=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0008_doctor_rating_sum'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doctor',
+            name='approved_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_approved_at, migrations.RunPython.noop),
+    ]
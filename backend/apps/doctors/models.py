@@ -1,5 +1,8 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, Count, F, Sum, Value, When
+from django.db.models.functions import Round
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from decimal import Decimal
 
 User = get_user_model()
@@ -36,27 +39,69 @@ class Doctor(models.Model):
     clinic_pincode = models.CharField(max_length=10, blank=True)
     online_consultation_available = models.BooleanField(default=False)
     is_approved = models.BooleanField(default=False)
+    approved_at = models.DateTimeField(blank=True, null=True)
     is_active = models.BooleanField(default=True)
     rating = models.DecimalField(max_digits=3, decimal_places=2, default=Decimal('0.00'))
     total_reviews = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)  # sum of all review ratings
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'doctors'
         ordering = ['-rating', '-created_at']
+        indexes = [
+            models.Index(fields=['is_approved', '-rating', '-created_at'],
+                         name='doctors_approved_rating_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.full_name} (Doctor)"
     
+    def save(self, *args, **kwargs):
+        # Keep approved_at in step with the approval flag
+        if self.is_approved != (self.approved_at is not None):
+            self.approved_at = timezone.now() if self.is_approved else None
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'approved_at'}
+        super().save(*args, **kwargs)
+    
+    @staticmethod
+    def apply_review_change(doctor_id, rating_delta, count_delta):
+        """
+        Adjust a doctor's running rating sum and review count in one atomic UPDATE.
+        
+        The average is recomputed from the adjusted columns in the same
+        statement, so concurrent review writes cannot lose updates.
+        """
+        rating_sum = F('rating_sum') + rating_delta
+        total_reviews = F('total_reviews') + count_delta
+        Doctor.objects.filter(pk=doctor_id).update(
+            rating_sum=rating_sum,
+            total_reviews=total_reviews,
+            rating=Case(
+                # Compares the pre-update count: new count > 0
+                When(total_reviews__gt=-count_delta,
+                     then=Round(rating_sum * Value(1.0) / total_reviews, 2)),
+                default=Value(Decimal('0.00')),
+                output_field=models.DecimalField(max_digits=3, decimal_places=2)
+            )
+        )
+    
     def update_rating(self):
-        """Update rating based on reviews."""
-        from apps.doctors.models import Review
-        reviews = Review.objects.filter(doctor=self)
-        if reviews.exists():
-            self.rating = reviews.aggregate(models.Avg('rating'))['rating__avg'] or Decimal('0.00')
-            self.total_reviews = reviews.count()
-            self.save()
+        """Recompute rating from scratch based on reviews."""
+        totals = Review.objects.filter(doctor=self).aggregate(
+            rating_sum=Sum('rating'), total_reviews=Count('id')
+        )
+        self.rating_sum = totals['rating_sum'] or 0
+        self.total_reviews = totals['total_reviews']
+        if self.total_reviews:
+            self.rating = round(Decimal(self.rating_sum) / self.total_reviews, 2)
+        else:
+            self.rating = Decimal('0.00')
+        Doctor.objects.filter(pk=self.pk).update(
+            rating=self.rating, rating_sum=self.rating_sum, total_reviews=self.total_reviews
+        )
 
 
 class Schedule(models.Model):
@@ -89,6 +134,28 @@ class Schedule(models.Model):
         return f"{self.doctor.user.full_name} - {self.get_day_of_week_display()}"
 
 
+class DoctorSlot(models.Model):
+    """Materialized slot inventory for a doctor, one row per bookable slot."""
+    STATE_CHOICES = [
+        ('available', 'Available'),
+        ('booked', 'Booked'),
+    ]
+    
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name='slots')
+    date = models.DateField()
+    time = models.TimeField()
+    state = models.CharField(max_length=20, choices=STATE_CHOICES, default='available')
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'doctor_slots'
+        unique_together = ['doctor', 'date', 'time']
+        ordering = ['doctor', 'date', 'time']
+    
+    def __str__(self):
+        return f"{self.doctor.user.full_name} - {self.date} {self.time} ({self.state})"
+
+
 class Review(models.Model):
     """Doctor review model."""
     patient = models.ForeignKey('patients.Patient', on_delete=models.CASCADE, related_name='reviews')
@@ -106,6 +173,25 @@ class Review(models.Model):
         return f"{self.patient.user.full_name} - {self.doctor.user.full_name} ({self.rating} stars)"
     
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.doctor.update_rating()
+        with transaction.atomic():
+            if self._state.adding:
+                super().save(*args, **kwargs)
+                Doctor.apply_review_change(self.doctor_id, self.rating, 1)
+                return
+            
+            previous = Review.objects.filter(pk=self.pk).values_list('doctor_id', 'rating').first()
+            super().save(*args, **kwargs)
+            if previous is None:
+                Doctor.apply_review_change(self.doctor_id, self.rating, 1)
+            elif previous[0] != self.doctor_id:
+                Doctor.apply_review_change(previous[0], -previous[1], -1)
+                Doctor.apply_review_change(self.doctor_id, self.rating, 1)
+            elif previous[1] != self.rating:
+                Doctor.apply_review_change(self.doctor_id, self.rating - previous[1], 0)
+    
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            Doctor.apply_review_change(self.doctor_id, -self.rating, -1)
+        return result
 
@@ -0,0 +1,228 @@
+"""
+Full-text search index for the doctor directory.
+
+On SQLite the index is an FTS5 virtual table keyed by doctor id; on
+PostgreSQL it is a table of weighted tsvector documents with a GIN index.
+Each doctor document holds their name, specialization names and clinic
+location. Other database backends have no index and search falls back to
+DoctorSearchFilter.
+"""
+import re
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import FloatField, Value
+from django.db.models.expressions import RawSQL
+
+SEARCH_TABLE = 'doctor_search'
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def get_search_words(terms):
+    """Split search terms into plain words safe to embed in a full-text query."""
+    words = []
+    for term in terms:
+        words.extend(WORD_RE.findall(term.lower()))
+    return words
+
+
+class SQLiteSearchBackend:
+    """FTS5 backed search index."""
+
+    def create(self, cursor):
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+            "USING fts5(name, specialties, location, tokenize='unicode61 remove_diacritics 2')"
+        )
+
+    def drop(self, cursor):
+        cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+    def write(self, cursor, documents):
+        """Insert or replace (doctor_id, name, specialties, location) documents."""
+        self.remove(cursor, [document[0] for document in documents])
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, name, specialties, location) VALUES (%s, %s, %s, %s)',
+            documents
+        )
+
+    def remove(self, cursor, doctor_ids):
+        cursor.executemany(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s',
+            [(doctor_id,) for doctor_id in doctor_ids]
+        )
+
+    def get_query(self, words):
+        # Every word must match, as a prefix, in any column
+        return ' '.join(f'"{word}"*' for word in words)
+
+    def match_sql(self, words):
+        """SQL selecting the ids of the doctors matching all words."""
+        return f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s', [self.get_query(words)]
+
+    def rank_sql(self, words, doctor_column):
+        """SQL ranking the doctor in `doctor_column`, lower is better."""
+        return (
+            f'SELECT bm25({SEARCH_TABLE}, 10.0, 5.0, 2.0) FROM {SEARCH_TABLE} '
+            f'WHERE {SEARCH_TABLE} MATCH %s AND rowid = {doctor_column}',
+            [self.get_query(words)]
+        )
+
+
+class PostgresSearchBackend:
+    """tsvector + GIN backed search index."""
+
+    def create(self, cursor):
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ('
+            'doctor_id bigint PRIMARY KEY REFERENCES doctors (id) ON DELETE CASCADE, '
+            'document tsvector NOT NULL)'
+        )
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document_idx '
+            f'ON {SEARCH_TABLE} USING GIN (document)'
+        )
+
+    def drop(self, cursor):
+        cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+    def write(self, cursor, documents):
+        """Insert or replace (doctor_id, name, specialties, location) documents."""
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (doctor_id, document) VALUES (%s, '
+            "setweight(to_tsvector('simple', %s), 'A') || "
+            "setweight(to_tsvector('simple', %s), 'B') || "
+            "setweight(to_tsvector('simple', %s), 'C')) "
+            'ON CONFLICT (doctor_id) DO UPDATE SET document = EXCLUDED.document',
+            documents
+        )
+
+    def remove(self, cursor, doctor_ids):
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE doctor_id = ANY(%s)',
+            [list(doctor_ids)]
+        )
+
+    def get_query(self, words):
+        return ' & '.join(f'{word}:*' for word in words)
+
+    def match_sql(self, words):
+        """SQL selecting the ids of the doctors matching all words."""
+        return (
+            f"SELECT doctor_id FROM {SEARCH_TABLE} WHERE document @@ to_tsquery('simple', %s)",
+            [self.get_query(words)]
+        )
+
+    def rank_sql(self, words, doctor_column):
+        """SQL ranking the doctor in `doctor_column`, lower is better."""
+        return (
+            f"SELECT -ts_rank(document, to_tsquery('simple', %s)) FROM {SEARCH_TABLE} "
+            f'WHERE doctor_id = {doctor_column}',
+            [self.get_query(words)]
+        )
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+# Whether the index table exists, per database alias
+_index_available = {}
+
+
+def get_backend(using=None):
+    """Get the search backend for a connection, or None when it has no index."""
+    using = using or connection
+    backend_class = BACKENDS.get(using.vendor)
+    if backend_class is None:
+        return None
+    if using.alias not in _index_available:
+        _index_available[using.alias] = SEARCH_TABLE in using.introspection.table_names()
+    if not _index_available[using.alias]:
+        return None
+    return backend_class()
+
+
+def build_documents(doctor_ids):
+    """Build (doctor_id, name, specialties, location) documents for doctors."""
+    from .models import Doctor
+
+    specialties = defaultdict(list)
+    through = Doctor.specialization.through.objects.filter(doctor_id__in=doctor_ids)
+    for doctor_id, name in through.values_list('doctor_id', 'specialty__name'):
+        specialties[doctor_id].append(name)
+
+    doctors = Doctor.objects.filter(id__in=doctor_ids).values_list(
+        'id', 'user__first_name', 'user__last_name', 'clinic_city', 'clinic_state'
+    )
+    return [
+        (doctor_id, f'{first_name} {last_name}', ' '.join(specialties[doctor_id]),
+         f'{city} {state}')
+        for doctor_id, first_name, last_name, city, state in doctors
+    ]
+
+
+def index_doctors(doctor_ids):
+    """Write the search documents of the given doctors."""
+    backend = get_backend()
+    doctor_ids = list(doctor_ids)
+    if backend is None or not doctor_ids:
+        return
+    documents = build_documents(doctor_ids)
+    with connection.cursor() as cursor:
+        backend.write(cursor, documents)
+
+
+def remove_doctors(doctor_ids):
+    """Remove doctors from the search index."""
+    backend = get_backend()
+    doctor_ids = list(doctor_ids)
+    if backend is None or not doctor_ids:
+        return
+    with connection.cursor() as cursor:
+        backend.remove(cursor, doctor_ids)
+
+
+def rebuild_index(batch_size=1000):
+    """Recreate the search index from scratch. Returns the number of doctors indexed."""
+    from .models import Doctor
+
+    backend_class = BACKENDS.get(connection.vendor)
+    if backend_class is None:
+        return 0
+    backend = backend_class()
+    with connection.cursor() as cursor:
+        backend.drop(cursor)
+        backend.create(cursor)
+    _index_available[connection.alias] = True
+
+    doctor_ids = list(Doctor.objects.values_list('id', flat=True))
+    for start in range(0, len(doctor_ids), batch_size):
+        index_doctors(doctor_ids[start:start + batch_size])
+    return len(doctor_ids)
+
+
+def search_doctors(queryset, terms):
+    """
+    Narrow a doctor queryset to the doctors matching all search terms.
+
+    Matching runs inside the queryset's own query, so its other filters and
+    pagination apply to every match. Each doctor is annotated with
+    `search_rank`, lower for better matches. Returns None when the database
+    has no search index.
+    """
+    backend = get_backend()
+    if backend is None:
+        return None
+    words = get_search_words(terms)
+    if not words:
+        return queryset.annotate(search_rank=Value(None, output_field=FloatField())).none()
+    quote_name = connection.ops.quote_name
+    doctor_column = f'{quote_name(queryset.model._meta.db_table)}.{quote_name(queryset.model._meta.pk.column)}'
+    match_sql, match_params = backend.match_sql(words)
+    rank_sql, rank_params = backend.rank_sql(words, doctor_column)
+    return queryset.filter(pk__in=RawSQL(match_sql, match_params)).annotate(
+        search_rank=RawSQL(rank_sql, rank_params, output_field=FloatField())
+    )
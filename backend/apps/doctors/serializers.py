@@ -2,6 +2,8 @@ from rest_framework import serializers
 from .models import Doctor, Specialty, Schedule, Review
 from apps.users.serializers import UserSerializer
 from apps.patients.serializers import PatientSerializer
+from .approvals import MAX_BATCH_SIZE
+from core.serializers import EagerLoadingMixin
 
 
 class SpecialtySerializer(serializers.ModelSerializer):
@@ -108,8 +110,11 @@ class DoctorRegistrationSerializer(serializers.Serializer):
         return doctor
 
 
-class DoctorSerializer(serializers.ModelSerializer):
+class DoctorSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """Doctor serializer."""
+    select_related_fields = ('user',)
+    prefetch_related_fields = ('specialization',)
+    
     user = UserSerializer(read_only=True)
     specialization = SpecialtySerializer(many=True, read_only=True)
     specialization_ids = serializers.PrimaryKeyRelatedField(
@@ -131,8 +136,40 @@ class DoctorSerializer(serializers.ModelSerializer):
                            'created_at', 'updated_at']
 
 
-class DoctorListSerializer(serializers.ModelSerializer):
+class PendingDoctorSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    """Doctor registration details for the admin review queue."""
+    select_related_fields = ('user',)
+    prefetch_related_fields = ('specialization',)
+    
+    email = serializers.EmailField(source='user.email', read_only=True)
+    full_name = serializers.CharField(source='user.full_name', read_only=True)
+    phone = serializers.CharField(source='user.phone', read_only=True)
+    specialization = serializers.SlugRelatedField(many=True, read_only=True, slug_field='name')
+    
+    class Meta:
+        model = Doctor
+        fields = ['id', 'email', 'full_name', 'phone', 'specialization', 'experience_years',
+                  'qualification', 'registration_number', 'clinic_city', 'clinic_state',
+                  'created_at']
+
+
+class DoctorReviewSerializer(serializers.Serializer):
+    """Approve or reject many pending doctors at once."""
+    ACTION_CHOICES = ['approve', 'reject']
+    
+    doctor_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=MAX_BATCH_SIZE
+    )
+    action = serializers.ChoiceField(choices=ACTION_CHOICES)
+
+
+class DoctorListSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """Simplified doctor serializer for list views."""
+    select_related_fields = ('user',)
+    prefetch_related_fields = ('specialization',)
+    
     user = UserSerializer(read_only=True)
     specialization = SpecialtySerializer(many=True, read_only=True)
     
@@ -0,0 +1,61 @@
+"""
+Keep the doctor search and autocomplete indexes in sync with doctors,
+users and specialties.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from . import autocomplete
+from .models import Doctor, Specialty
+from .search import index_doctors, remove_doctors
+
+User = get_user_model()
+
+
+def refresh_doctors(doctor_ids):
+    doctor_ids = list(doctor_ids)
+    index_doctors(doctor_ids)
+    autocomplete.refresh_doctors(doctor_ids)
+
+
+@receiver(post_save, sender=Doctor)
+def index_saved_doctor(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_doctors([instance.pk])
+
+
+@receiver(post_delete, sender=Doctor)
+def remove_deleted_doctor(sender, instance, **kwargs):
+    remove_doctors([instance.pk])
+    autocomplete.remove_doctor(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def index_saved_user(sender, instance, raw=False, **kwargs):
+    if not raw and instance.user_type == 'doctor':
+        refresh_doctors(Doctor.objects.filter(user=instance).values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Specialty)
+def index_saved_specialty(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    autocomplete.refresh_specialty(instance)
+    if not created:
+        index_doctors(instance.doctors.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Specialty)
+def remove_deleted_specialty(sender, instance, **kwargs):
+    autocomplete.remove_specialty(instance.pk)
+
+
+@receiver(m2m_changed, sender=Doctor.specialization.through)
+def index_changed_specializations(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        refresh_doctors([instance.pk])
+    elif pk_set:
+        refresh_doctors(pk_set)
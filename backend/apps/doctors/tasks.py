@@ -0,0 +1,12 @@
+"""
+Scheduled doctor tasks.
+"""
+from celery import shared_task
+
+from . import inventory
+
+
+@shared_task
+def generate_slot_inventory():
+    """Extend every approved doctor's slot inventory to the full horizon."""
+    return inventory.generate_all_slots()
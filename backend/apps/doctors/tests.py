@@ -0,0 +1,129 @@
+from datetime import date, time, timedelta
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.appointments.models import Appointment
+from apps.patients.models import Patient
+from apps.users.models import User
+from .inventory import generate_slots
+from .models import Doctor, Schedule, Specialty
+
+
+class AvailableSlotsQueryTests(TestCase):
+    """The slot endpoints run a fixed number of queries however busy the doctor is."""
+
+    @classmethod
+    def setUpTestData(cls):
+        specialty = Specialty.objects.create(name='Cardiology')
+        user = User.objects.create_user('doctor@example.com', 'pw12345678', first_name='Asha',
+                                        last_name='Rao', user_type='doctor')
+        cls.doctor = Doctor.objects.create(user=user, is_approved=True)
+        cls.doctor.specialization.add(specialty)
+        for day_of_week in range(7):
+            Schedule.objects.create(doctor=cls.doctor, day_of_week=day_of_week,
+                                    start_time=time(9), end_time=time(17), slot_duration=30)
+        patient_user = User.objects.create_user('patient@example.com', 'pw12345678',
+                                                first_name='Ravi', last_name='Kumar')
+        cls.patient = Patient.objects.create(user=patient_user)
+        cls.day = date.today() + timedelta(days=3)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def book(self, count):
+        for index in range(count):
+            Appointment.objects.create(patient=self.patient, doctor=self.doctor,
+                                       appointment_date=self.day,
+                                       appointment_time=time(9 + index // 2, 30 * (index % 2)))
+
+    def get_slots(self, queries):
+        # Doctor, inventory, schedule and booked times
+        with self.assertNumQueries(queries):
+            response = self.client.get(f'/api/doctors/{self.doctor.pk}/available_slots/',
+                                       {'date': self.day.isoformat()})
+        self.assertEqual(response.status_code, 200)
+        return response.data['available_slots']
+
+    def test_available_slots_without_inventory(self):
+        self.assertEqual(len(self.get_slots(4)), 16)
+        self.book(5)
+        self.assertEqual(len(self.get_slots(4)), 11)
+
+    def test_available_slots_from_inventory(self):
+        self.book(5)
+        generate_slots(self.doctor)
+        # Doctor and inventory only
+        self.assertEqual(len(self.get_slots(2)), 11)
+
+    def test_availability_range(self):
+        self.book(5)
+        for days in (1, 14):
+            with self.assertNumQueries(4):
+                response = self.client.get(f'/api/doctors/{self.doctor.pk}/availability/', {
+                    'from': self.day.isoformat(),
+                    'to': (self.day + timedelta(days=days - 1)).isoformat(),
+                })
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data['days']), days)
+
+
+def create_doctor(index, specialties, **fields):
+    user = User.objects.create_user(f'doctor{index}@example.com', 'pw12345678',
+                                    first_name=f'Doctor{index}', last_name='Rao', user_type='doctor')
+    doctor = Doctor.objects.create(user=user, **fields)
+    doctor.specialization.add(*specialties)
+    return doctor
+
+
+class DoctorQueryTests(TestCase):
+    """Doctor pages load users and specializations in a fixed number of queries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.specialties = [Specialty.objects.create(name=name) for name in ('Cardiology', 'Dermatology')]
+        cls.admin = User.objects.create_superuser('admin@example.com', 'pw12345678',
+                                                  first_name='Ad', last_name='Min')
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def add_doctors(self, count, **fields):
+        start = Doctor.objects.count()
+        return [create_doctor(start + index, self.specialties, **fields) for index in range(count)]
+
+    def test_list(self):
+        for count in (2, 10):
+            self.add_doctors(count - Doctor.objects.count(), is_approved=True)
+            # Count, page and specializations
+            with self.assertNumQueries(3):
+                response = self.client.get('/api/doctors/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data['results']), count)
+
+    def test_retrieve(self):
+        doctor, = self.add_doctors(1, is_approved=True)
+        # Doctor with user, then specializations
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/doctors/{doctor.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['specialization']), 2)
+
+    def test_profile(self):
+        doctor, = self.add_doctors(1)
+        self.client.force_authenticate(doctor.user)
+        # Doctor with user, then specializations
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/doctors/profile/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['id'], doctor.pk)
+
+    def test_pending_queue(self):
+        self.client.force_authenticate(self.admin)
+        for count in (2, 10):
+            self.add_doctors(count - Doctor.objects.count())
+            # Count, page and specializations
+            with self.assertNumQueries(3):
+                response = self.client.get('/api/admin/doctors/pending/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data['results']), count)
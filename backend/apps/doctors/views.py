@@ -4,10 +4,17 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import datetime
 from .models import Doctor, Specialty, Schedule
 from .serializers import DoctorSerializer, DoctorListSerializer, SpecialtySerializer, ScheduleSerializer
+from .availability import (get_available_slots, get_availability_range, find_next_available,
+                           MAX_RANGE_DAYS)
+from .inventory import generate_slots
+from . import autocomplete
+from .facets import get_facet_counts
+from .filters import DoctorFilter, DoctorFullTextSearchFilter, specialization_exists
 from apps.appointments.models import Appointment
+from core.pagination import SwitchablePagination
 
 
 class SpecialtyViewSet(viewsets.ReadOnlyModelViewSet):
@@ -21,28 +28,50 @@ class DoctorViewSet(viewsets.ModelViewSet):
     """Doctor viewset."""
     queryset = Doctor.objects.filter(is_approved=True)
     serializer_class = DoctorSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # Full-text search runs last so it can order results by relevance
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, DoctorFullTextSearchFilter]
     search_fields = ['user__first_name', 'user__last_name', 'specialization__name', 
                      'clinic_city', 'clinic_state']
-    filterset_fields = ['specialization', 'online_consultation_available', 
-                       'clinic_city', 'clinic_state']
+    filterset_class = DoctorFilter
     ordering_fields = ['rating', 'experience_years', 'consultation_fee', 'created_at']
     ordering = ['-rating']
+    pagination_class = SwitchablePagination
+    keyset_ordering = ('-rating', '-created_at', '-id')
     
     def get_queryset(self):
         """Get approved doctors with specializations."""
         queryset = Doctor.objects.filter(is_approved=True)
         # Only show doctors that have at least one specialization
-        queryset = queryset.filter(specialization__isnull=False).distinct()
-        return queryset
+        queryset = queryset.filter(specialization_exists())
+        # Slot lookups only read the doctor row, not the serialized relations
+        if self.action in ('available_slots', 'availability', 'next_available'):
+            return queryset
+        return self.get_serializer_class().setup_eager_loading(queryset)
     
     def get_serializer_class(self):
         if self.action == 'list':
             return DoctorListSerializer
         return DoctorSerializer
     
+    def list(self, request, *args, **kwargs):
+        """List doctors, with facet counts when ?facets=true is given."""
+        queryset = self.filter_queryset(self.get_queryset())
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            response = self.get_paginated_response(serializer.data)
+        else:
+            serializer = self.get_serializer(queryset, many=True)
+            response = Response({'results': serializer.data})
+        
+        if request.query_params.get('facets') in ('1', 'true'):
+            response.data['facets'] = get_facet_counts(queryset, request.query_params)
+        return response
+    
     def get_permissions(self):
-        if self.action in ['list', 'retrieve', 'available_slots']:
+        if self.action in ['list', 'retrieve', 'available_slots', 'availability', 'next_available',
+                           'autocomplete']:
             return [AllowAny()]
         return [IsAuthenticated()]
     
@@ -66,71 +95,127 @@ class DoctorViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Get schedule for the day of week
-        day_of_week = date.weekday()
-        schedule = Schedule.objects.filter(doctor=doctor, day_of_week=day_of_week, is_available=True).first()
+        available_slots = get_available_slots(doctor, date)
+        return Response({'available_slots': available_slots})
+    
+    @action(detail=True, methods=['get'], permission_classes=[AllowAny])
+    def availability(self, request, pk=None):
+        """Get available time slots for a doctor for every day in a date range."""
+        doctor = self.get_object()
+        from_str = request.query_params.get('from')
+        to_str = request.query_params.get('to')
         
-        # If no schedule exists, provide default slots (9 AM to 5 PM, 30 min intervals)
-        if not schedule:
-            from datetime import time
-            default_start = time(9, 0)  # 9:00 AM
-            default_end = time(17, 0)   # 5:00 PM
-            default_duration = 30  # 30 minutes
-            
-            # Generate default slots
-            available_slots = []
-            current_hour = default_start.hour
-            current_minute = default_start.minute
-            
-            while current_hour < default_end.hour or (current_hour == default_end.hour and current_minute < default_end.minute):
-                slot_time = time(current_hour, current_minute)
-                slot_str = slot_time.strftime('%H:%M')
-                
-                # Check if this slot is already booked
-                is_booked = Appointment.objects.filter(
-                    doctor=doctor,
-                    appointment_date=date,
-                    appointment_time=slot_str,
-                    status__in=['pending', 'confirmed']
-                ).exists()
-                
-                if not is_booked:
-                    available_slots.append(slot_str)
-                
-                # Move to next slot
-                current_minute += default_duration
-                if current_minute >= 60:
-                    current_minute = 0
-                    current_hour += 1
-            
-            return Response({'available_slots': available_slots})
+        if not from_str or not to_str:
+            return Response(
+                {'error': 'from and to parameters are required (YYYY-MM-DD)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Get booked appointments for the date
-        booked_appointments = Appointment.objects.filter(
-            doctor=doctor,
-            appointment_date=date,
-            status__in=['pending', 'confirmed']
-        ).values_list('appointment_time', flat=True)
+        try:
+            start_date = datetime.strptime(from_str, '%Y-%m-%d').date()
+            end_date = datetime.strptime(to_str, '%Y-%m-%d').date()
+        except ValueError:
+            return Response(
+                {'error': 'Invalid date format. Use YYYY-MM-DD'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Generate available slots
-        available_slots = []
-        current_time = datetime.combine(date, schedule.start_time)
-        end_time = datetime.combine(date, schedule.end_time)
-        slot_duration = timedelta(minutes=schedule.slot_duration)
+        if end_date < start_date:
+            return Response(
+                {'error': 'to must not be before from'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        while current_time + slot_duration <= end_time:
-            slot_time = current_time.time()
-            if slot_time not in booked_appointments:
-                available_slots.append(slot_time.strftime('%H:%M'))
-            current_time += slot_duration
+        if (end_date - start_date).days >= MAX_RANGE_DAYS:
+            return Response(
+                {'error': f'Date range cannot exceed {MAX_RANGE_DAYS} days'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        return Response({'available_slots': available_slots})
+        days = get_availability_range(doctor, start_date, end_date)
+        return Response({
+            'from': start_date.isoformat(),
+            'to': end_date.isoformat(),
+            'total_available': sum(day['available_count'] for day in days),
+            'days': days,
+        })
+    
+    @action(detail=False, methods=['get'], permission_classes=[AllowAny])
+    def next_available(self, request):
+        """Find the doctors with the earliest free slots, optionally by specialization and city."""
+        specialization = request.query_params.get('specialization')
+        city = request.query_params.get('city')
+        from_str = request.query_params.get('from')
+        
+        try:
+            days = min(int(request.query_params.get('days', 7)), MAX_RANGE_DAYS)
+            limit = min(int(request.query_params.get('limit', 10)), 50)
+        except ValueError:
+            return Response(
+                {'error': 'days and limit must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if days < 1 or limit < 1:
+            return Response(
+                {'error': 'days and limit must be positive'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        now = timezone.localtime()
+        start_date = now.date()
+        if from_str:
+            try:
+                start_date = max(datetime.strptime(from_str, '%Y-%m-%d').date(), now.date())
+            except ValueError:
+                return Response(
+                    {'error': 'Invalid date format. Use YYYY-MM-DD'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        doctors = self.get_queryset()
+        if specialization:
+            if specialization.isdigit():
+                doctors = doctors.filter(specialization_exists(specialty_id=specialization))
+            else:
+                doctors = doctors.filter(specialization_exists(specialty__name__iexact=specialization))
+        if city:
+            doctors = doctors.filter(clinic_city__iexact=city)
+        
+        matches = find_next_available(
+            doctors.values_list('id', flat=True), start_date, days, limit, now=now
+        )
+        
+        doctor_map = DoctorListSerializer.setup_eager_loading(Doctor.objects.all()).in_bulk(
+            [doctor_id for _, _, doctor_id in matches]
+        )
+        results = [
+            {
+                'doctor': DoctorListSerializer(doctor_map[doctor_id], context={'request': request}).data,
+                'date': date.isoformat(),
+                'time': slot_time.strftime('%H:%M'),
+            }
+            for date, slot_time, doctor_id in matches
+        ]
+        return Response({'results': results})
+    
+    @action(detail=False, methods=['get'], permission_classes=[AllowAny])
+    def autocomplete(self, request):
+        """Suggest doctors, specialties and cities for a typed prefix."""
+        prefix = request.query_params.get('q', '')
+        try:
+            limit = min(int(request.query_params.get('limit', 5)), 20)
+        except ValueError:
+            return Response(
+                {'error': 'limit must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(autocomplete.suggest(prefix, limit))
     
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def profile(self, request):
         """Get current doctor profile."""
         try:
-            doctor = Doctor.objects.get(user=request.user)
+            doctor = DoctorSerializer.setup_eager_loading(Doctor.objects.all()).get(user=request.user)
             serializer = self.get_serializer(doctor)
             return Response(serializer.data)
         except Doctor.DoesNotExist:
@@ -173,6 +258,7 @@ class DoctorViewSet(viewsets.ModelViewSet):
                     day_of_week=schedule_data.get('day_of_week'),
                     defaults=schedule_data
                 )
+                generate_slots(doctor)
                 serializer = ScheduleSerializer(schedule)
                 return Response(serializer.data, 
                               status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
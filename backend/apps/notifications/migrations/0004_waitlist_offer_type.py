@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_notification_created_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='notification_type',
+            field=models.CharField(choices=[('appointment_confirmation', 'Appointment Confirmation'), ('appointment_reminder', 'Appointment Reminder'), ('appointment_cancelled', 'Appointment Cancelled'), ('doctor_message', 'Doctor Message'), ('prescription_update', 'Prescription Update'), ('waitlist_offer', 'Waitlist Offer'), ('system', 'System Notification')], default='system', max_length=50),
+        ),
+    ]
@@ -13,6 +13,7 @@ class Notification(models.Model):
         ('appointment_cancelled', 'Appointment Cancelled'),
         ('doctor_message', 'Doctor Message'),
         ('prescription_update', 'Prescription Update'),
+        ('waitlist_offer', 'Waitlist Offer'),
         ('system', 'System Notification'),
     ]
     
@@ -26,6 +27,9 @@ class Notification(models.Model):
     class Meta:
         db_table = 'notifications'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='notifications_user_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.user.email}"
@@ -4,12 +4,15 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from .models import Notification
 from .serializers import NotificationSerializer
+from core.pagination import SwitchablePagination
 
 
 class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     """Notification viewset."""
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = SwitchablePagination
+    keyset_ordering = ('-created_at', '-id')
     
     def get_queryset(self):
         """Get notifications for current user."""
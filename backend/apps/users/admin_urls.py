@@ -1,16 +1,22 @@
+import os
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework.permissions import IsAdminUser
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from django.contrib.auth import get_user_model
+from datetime import datetime, timedelta
 from django.utils import timezone
 from apps.doctors.models import Doctor
-from apps.patients.models import Patient
-from apps.appointments.models import Appointment
-from apps.doctors.serializers import DoctorSerializer
+from apps.doctors.approvals import get_pending_doctors, review_doctors
+from apps.doctors.serializers import DoctorSerializer, PendingDoctorSerializer, DoctorReviewSerializer
 from apps.patients.serializers import PatientSerializer
 from apps.appointments.serializers import AppointmentSerializer
+from apps.analytics.rollups import get_dashboard, MAX_TREND_DAYS
+from apps.users.exports import EXPORTS, FILE_FORMATS, stream_export
+from apps.users.importers import IMPORT_KINDS, import_users, open_upload, read_rows
+from apps.analytics.metrics import get_metrics, GROUP_BY_CHOICES, MAX_RANGE_DAYS
 
 User = get_user_model()
 
@@ -18,45 +24,138 @@ User = get_user_model()
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def admin_dashboard(request):
-    """Admin dashboard statistics."""
-    stats = {
-        'total_patients': Patient.objects.count(),
-        'total_doctors': Doctor.objects.count(),
-        'total_appointments': Appointment.objects.count(),
-        'today_appointments': Appointment.objects.filter(
-            appointment_date=timezone.now().date()
-        ).count(),
-        'pending_doctors': Doctor.objects.filter(is_approved=False).count(),
-    }
-    return Response(stats)
+    """Admin dashboard statistics and daily trends, read from the rollup counters."""
+    try:
+        days = int(request.query_params.get('days', 30))
+    except ValueError:
+        return Response({'error': 'days must be a number'}, status=400)
+    days = max(1, min(days, MAX_TREND_DAYS))
+    return Response(get_dashboard(days))
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def admin_analytics(request):
+    """Utilization, cancellation and no-show rates and lead time per doctor or specialty."""
+    group_by = request.query_params.get('group_by', 'doctor')
+    if group_by not in GROUP_BY_CHOICES:
+        return Response({'error': f"group_by must be one of: {', '.join(GROUP_BY_CHOICES)}"}, status=400)
+    
+    today = timezone.localdate()
+    try:
+        end_date = datetime.strptime(request.query_params['to'], '%Y-%m-%d').date() \
+            if request.query_params.get('to') else today
+        start_date = datetime.strptime(request.query_params['from'], '%Y-%m-%d').date() \
+            if request.query_params.get('from') else end_date - timedelta(days=29)
+    except ValueError:
+        return Response({'error': 'Invalid date format. Use YYYY-MM-DD'}, status=400)
+    
+    if end_date < start_date:
+        return Response({'error': 'to must not be before from'}, status=400)
+    if (end_date - start_date).days >= MAX_RANGE_DAYS:
+        return Response({'error': f'Date range cannot exceed {MAX_RANGE_DAYS} days'}, status=400)
+    
+    return Response(get_metrics(start_date, end_date, group_by))
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def admin_export(request, name):
+    """Stream appointments, patients or doctors as CSV or NDJSON."""
+    if name not in EXPORTS:
+        return Response({'error': f"Unknown export. Use one of: {', '.join(EXPORTS)}"}, status=404)
+    
+    # `format` is taken by DRF's format suffix override
+    file_format = request.query_params.get('file_format', 'csv')
+    if file_format not in FILE_FORMATS:
+        return Response({'error': f"file_format must be one of: {', '.join(FILE_FORMATS)}"}, status=400)
+    
+    try:
+        start_date = datetime.strptime(request.query_params['from'], '%Y-%m-%d').date() \
+            if request.query_params.get('from') else None
+        end_date = datetime.strptime(request.query_params['to'], '%Y-%m-%d').date() \
+            if request.query_params.get('to') else None
+    except ValueError:
+        return Response({'error': 'Invalid date format. Use YYYY-MM-DD'}, status=400)
+    
+    statuses = [value for value in request.query_params.get('status', '').split(',') if value]
+    unknown = [value for value in statuses if value not in EXPORTS[name].statuses]
+    if unknown:
+        return Response(
+            {'error': f"Invalid status. Use one of: {', '.join(EXPORTS[name].statuses)}"}, status=400
+        )
+    
+    return stream_export(name, file_format, start_date, end_date, statuses)
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def admin_import(request, kind):
+    """Bulk import patients or doctors from an uploaded CSV or NDJSON file."""
+    if kind not in IMPORT_KINDS:
+        return Response({'error': f"Unknown import. Use one of: {', '.join(IMPORT_KINDS)}"}, status=404)
+    
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'error': 'file is required'}, status=400)
+    
+    file_format = request.data.get('file_format') or os.path.splitext(upload.name)[1].lstrip('.').lower()
+    if file_format not in FILE_FORMATS:
+        return Response({'error': f"file_format must be one of: {', '.join(FILE_FORMATS)}"}, status=400)
+    
+    invite = str(request.data.get('invite', '')).lower() in ('1', 'true', 'yes')
+    result = import_users(kind, read_rows(open_upload(upload), file_format), invite=invite)
+    return Response(result)
 
 
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def pending_doctors(request):
-    """Get pending doctor registrations."""
-    doctors = Doctor.objects.filter(is_approved=False)
-    serializer = DoctorSerializer(doctors, many=True)
-    return Response(serializer.data)
+    """Get pending doctor registrations, oldest first, a page at a time."""
+    doctors = PendingDoctorSerializer.setup_eager_loading(get_pending_doctors())
+    paginator = api_settings.DEFAULT_PAGINATION_CLASS()
+    page = paginator.paginate_queryset(doctors, request)
+    serializer = PendingDoctorSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def review_pending_doctors(request):
+    """Approve or reject many pending doctors in one request."""
+    serializer = DoctorReviewSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    doctor_ids = serializer.validated_data['doctor_ids']
+    action = serializer.validated_data['action']
+    
+    changed = review_doctors(doctor_ids, approve=action == 'approve')
+    changed_ids = set(changed)
+    return Response({
+        'action': action,
+        'updated': changed,
+        'skipped': [doctor_id for doctor_id in dict.fromkeys(doctor_ids) if doctor_id not in changed_ids],
+    })
 
 
 @api_view(['POST'])
 @permission_classes([IsAdminUser])
 def approve_doctor(request, doctor_id):
     """Approve a doctor registration."""
-    try:
-        doctor = Doctor.objects.get(id=doctor_id)
-        doctor.is_approved = True
-        doctor.save()
-        serializer = DoctorSerializer(doctor)
-        return Response(serializer.data)
-    except Doctor.DoesNotExist:
+    if not Doctor.objects.filter(id=doctor_id).exists():
         return Response({'error': 'Doctor not found'}, status=404)
+    review_doctors([doctor_id])
+    doctor = DoctorSerializer.setup_eager_loading(Doctor.objects.all()).get(id=doctor_id)
+    serializer = DoctorSerializer(doctor)
+    return Response(serializer.data)
 
 
 urlpatterns = [
     path('dashboard/', admin_dashboard, name='admin-dashboard'),
+    path('analytics/', admin_analytics, name='admin-analytics'),
+    path('export/<str:name>/', admin_export, name='admin-export'),
+    path('import/<str:kind>/', admin_import, name='admin-import'),
     path('doctors/pending/', pending_doctors, name='pending-doctors'),
+    path('doctors/pending/review/', review_pending_doctors, name='review-pending-doctors'),
     path('doctors/<int:doctor_id>/approve/', approve_doctor, name='approve-doctor'),
 ]
 
@@ -0,0 +1,154 @@
+"""
+Streaming CSV and NDJSON exports of appointments, patients and doctors.
+
+Rows are read as flat values_list() tuples with QuerySet.iterator(), which
+uses a server-side cursor where the database supports one, and are encoded
+one at a time into a StreamingHttpResponse, so memory stays flat however
+many rows are exported.
+"""
+import csv
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from apps.appointments.models import Appointment
+from apps.doctors.models import Doctor
+from apps.patients.models import Patient
+
+FILE_FORMATS = ('csv', 'ndjson')
+
+
+class Export:
+    """An exportable queryset: its columns, date field and status filters."""
+
+    def __init__(self, model, columns, date_field, statuses):
+        self.model = model
+        # (column name, lookup) pairs
+        self.columns = columns
+        self.date_field = date_field
+        self.statuses = statuses
+
+    def get_queryset(self, start_date=None, end_date=None, statuses=()):
+        queryset = self.model.objects.all()
+        if start_date:
+            queryset = queryset.filter(**{f'{self.date_field}__gte': start_date})
+        if end_date:
+            queryset = queryset.filter(**{f'{self.date_field}__lte': end_date})
+        if statuses:
+            condition = Q()
+            for name in statuses:
+                condition |= self.statuses[name]
+            queryset = queryset.filter(condition)
+        return queryset.order_by('id')
+
+    def get_rows(self, queryset):
+        chunk_size = getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+        lookups = [lookup for _, lookup in self.columns]
+        return queryset.values_list(*lookups).iterator(chunk_size=chunk_size)
+
+
+EXPORTS = {
+    'appointments': Export(
+        Appointment,
+        columns=[
+            ('id', 'id'),
+            ('appointment_date', 'appointment_date'),
+            ('appointment_time', 'appointment_time'),
+            ('status', 'status'),
+            ('appointment_type', 'appointment_type'),
+            ('patient_id', 'patient_id'),
+            ('patient_email', 'patient__user__email'),
+            ('doctor_id', 'doctor_id'),
+            ('doctor_email', 'doctor__user__email'),
+            ('created_at', 'created_at'),
+            ('cancelled_at', 'cancelled_at'),
+        ],
+        date_field='appointment_date',
+        statuses={value: Q(status=value) for value, _ in Appointment.STATUS_CHOICES},
+    ),
+    'patients': Export(
+        Patient,
+        columns=[
+            ('id', 'id'),
+            ('email', 'user__email'),
+            ('first_name', 'user__first_name'),
+            ('last_name', 'user__last_name'),
+            ('phone', 'user__phone'),
+            ('date_of_birth', 'date_of_birth'),
+            ('gender', 'gender'),
+            ('blood_group', 'blood_group'),
+            ('city', 'city'),
+            ('state', 'state'),
+            ('created_at', 'created_at'),
+        ],
+        date_field='created_at__date',
+        statuses={
+            'active': Q(user__is_active=True),
+            'inactive': Q(user__is_active=False),
+        },
+    ),
+    'doctors': Export(
+        Doctor,
+        columns=[
+            ('id', 'id'),
+            ('email', 'user__email'),
+            ('first_name', 'user__first_name'),
+            ('last_name', 'user__last_name'),
+            ('phone', 'user__phone'),
+            ('registration_number', 'registration_number'),
+            ('experience_years', 'experience_years'),
+            ('consultation_fee', 'consultation_fee'),
+            ('clinic_city', 'clinic_city'),
+            ('clinic_state', 'clinic_state'),
+            ('is_approved', 'is_approved'),
+            ('is_active', 'is_active'),
+            ('rating', 'rating'),
+            ('total_reviews', 'total_reviews'),
+            ('created_at', 'created_at'),
+            ('approved_at', 'approved_at'),
+        ],
+        date_field='created_at__date',
+        statuses={
+            'approved': Q(is_approved=True),
+            'pending': Q(is_approved=False, is_active=True),
+            'rejected': Q(is_approved=False, is_active=False),
+        },
+    ),
+}
+
+
+class Echo:
+    """File-like object whose write() returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def encode_csv(names, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(names)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def encode_ndjson(names, rows):
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode(dict(zip(names, row))) + '\n'
+
+
+def stream_export(name, file_format, start_date=None, end_date=None, statuses=()):
+    """Streaming response with every matching row of an export."""
+    export = EXPORTS[name]
+    names = [column for column, _ in export.columns]
+    rows = export.get_rows(export.get_queryset(start_date, end_date, statuses))
+    if file_format == 'csv':
+        response = StreamingHttpResponse(encode_csv(names, rows), content_type='text/csv')
+    else:
+        response = StreamingHttpResponse(encode_ndjson(names, rows), content_type='application/x-ndjson')
+    filename = f'{name}-{timezone.localdate().isoformat()}.{file_format}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,386 @@
+"""
+Bulk import of patients and doctors from CSV or NDJSON files.
+
+Rows are handled in batches. Each batch is validated in memory, checked
+for already registered emails and phones with one query, and written
+with bulk_create: users, then their patient or doctor profiles, then the
+doctors' specialization rows. Passwords are hashed across a process pool;
+in invite mode no password is set and people choose one through the
+password reset flow.
+
+bulk_create skips model signals, so the search and autocomplete indexes
+are refreshed for imported doctors and `users_imported` is sent for the
+dashboard rollups.
+"""
+import csv
+import io
+import json
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Lower, Replace
+from django.dispatch import Signal
+from rest_framework import serializers
+
+from apps.doctors.models import Doctor, Specialty
+from apps.patients.models import Patient
+
+User = get_user_model()
+
+# Sent after an import batch is written. `patient_ids` and `doctor_ids` list
+# the created profiles and `created_at` is the creation time they share.
+users_imported = Signal()
+
+IMPORT_KINDS = ('patients', 'doctors')
+
+# Errors listed in an import result; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+# Characters dropped from phone numbers before comparing them
+PHONE_SEPARATORS = ' -().'
+PHONE_RE = re.compile(r'^\+?\d+$')
+
+
+def normalize_email(email):
+    return email.strip().lower()
+
+
+def normalize_phone(phone):
+    """A phone number without separators, e.g. +919876543210 for '+91 98765-43210'."""
+    phone = (phone or '').strip()
+    for separator in PHONE_SEPARATORS:
+        phone = phone.replace(separator, '')
+    return phone
+
+
+def normalized_phone(field):
+    """Database expression applying normalize_phone() to a column."""
+    expression = F(field)
+    for separator in PHONE_SEPARATORS:
+        expression = Replace(expression, Value(separator), Value(''))
+    return expression
+
+
+class ImportUserSerializer(serializers.Serializer):
+    """User columns shared by patient and doctor rows."""
+    email = serializers.EmailField()
+    first_name = serializers.CharField(max_length=150)
+    last_name = serializers.CharField(max_length=150)
+    phone = serializers.CharField(max_length=20, required=False, allow_blank=True, default='')
+    password = serializers.CharField(required=False, allow_blank=True, default='')
+
+    def validate_email(self, value):
+        return normalize_email(value)
+
+    def validate_phone(self, value):
+        value = normalize_phone(value)
+        if value and not PHONE_RE.match(value):
+            raise serializers.ValidationError('Enter a valid phone number.')
+        return value
+
+    def validate(self, attrs):
+        if attrs['password']:
+            user = User(email=attrs['email'], first_name=attrs['first_name'],
+                        last_name=attrs['last_name'])
+            try:
+                validate_password(attrs['password'], user)
+            except ValidationError as e:
+                raise serializers.ValidationError({'password': list(e.messages)})
+        return attrs
+
+
+class ImportPatientSerializer(ImportUserSerializer):
+    date_of_birth = serializers.DateField(required=False, allow_null=True, default=None)
+    gender = serializers.ChoiceField(choices=Patient.GENDER_CHOICES, required=False,
+                                     allow_blank=True, default='')
+    blood_group = serializers.ChoiceField(choices=Patient.BLOOD_GROUP_CHOICES, required=False,
+                                          allow_blank=True, default='')
+    address = serializers.CharField(required=False, allow_blank=True, default='')
+    city = serializers.CharField(max_length=100, required=False, allow_blank=True, default='')
+    state = serializers.CharField(max_length=100, required=False, allow_blank=True, default='')
+    pincode = serializers.CharField(max_length=10, required=False, allow_blank=True, default='')
+    emergency_contact = serializers.CharField(max_length=20, required=False, allow_blank=True,
+                                              default='')
+
+
+class ImportDoctorSerializer(ImportUserSerializer):
+    experience_years = serializers.IntegerField(min_value=0, required=False, default=0)
+    qualification = serializers.CharField(max_length=200, required=False, allow_blank=True, default='')
+    registration_number = serializers.CharField(max_length=100, required=False, allow_blank=True,
+                                                default='')
+    consultation_fee = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0,
+                                                required=False, default=0)
+    # Specialty names separated by semicolons
+    specializations = serializers.CharField(required=False, allow_blank=True, default='')
+    clinic_address = serializers.CharField(required=False, allow_blank=True, default='')
+    clinic_city = serializers.CharField(max_length=100, required=False, allow_blank=True, default='')
+    clinic_state = serializers.CharField(max_length=100, required=False, allow_blank=True, default='')
+    clinic_pincode = serializers.CharField(max_length=10, required=False, allow_blank=True, default='')
+    online_consultation_available = serializers.BooleanField(required=False, default=False)
+
+    def validate_specializations(self, value):
+        names = [name.strip() for name in value.split(';') if name.strip()]
+        specialties = self.context['specialties']
+        unknown = [name for name in names if name.lower() not in specialties]
+        if unknown:
+            raise serializers.ValidationError(f"Unknown specialties: {', '.join(unknown)}")
+        return [specialties[name.lower()] for name in names]
+
+
+USER_FIELDS = ('email', 'first_name', 'last_name', 'phone')
+
+
+def read_rows(file, file_format):
+    """Yield the rows of a CSV or NDJSON text file as dicts."""
+    if file_format == 'csv':
+        for row in csv.DictReader(file):
+            # Empty cells mean the column was not given
+            yield {key: value for key, value in row.items() if key and value not in (None, '')}
+    else:
+        for line in file:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield None
+
+
+def open_upload(upload):
+    """Text stream over an uploaded file, tolerating a UTF-8 byte order mark."""
+    return io.TextIOWrapper(upload, encoding='utf-8-sig', newline='')
+
+
+def create_hash_pool(workers):
+    """
+    Process pool for password hashing.
+
+    Workers are spawned rather than forked so they never share the parent's
+    database connections.
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=django.setup)
+
+
+def hash_passwords(passwords, pool=None, workers=1):
+    """Hash passwords, across a process pool if given; empty passwords become unusable ones."""
+    hashed = [make_password(None) if not password else None for password in passwords]
+    todo = [index for index, password in enumerate(passwords) if password]
+    if pool is None or len(todo) < 2:
+        results = map(make_password, [passwords[index] for index in todo])
+    else:
+        chunksize = max(1, len(todo) // (workers * 4))
+        results = pool.map(make_password, [passwords[index] for index in todo], chunksize=chunksize)
+    for index, value in zip(todo, results):
+        hashed[index] = value
+    return hashed
+
+
+def find_registered(emails, phones):
+    """
+    Emails and phones among the given normalized ones that already belong to a user.
+
+    Stored emails and phones are compared in the same normalized form, in one query.
+    """
+    users = User.objects.annotate(email_normalized=Lower('email'))
+    condition = Q(email_normalized__in=emails)
+    if phones:
+        users = users.annotate(phone_normalized=normalized_phone('phone'))
+        condition |= Q(phone_normalized__in=phones)
+    registered_emails = set()
+    registered_phones = set()
+    for email, phone in users.filter(condition).values_list('email', 'phone'):
+        registered_emails.add(normalize_email(email))
+        if phone:
+            registered_phones.add(normalize_phone(phone))
+    return registered_emails, registered_phones
+
+
+class Importer:
+    """
+    Import patient or doctor rows in batches.
+
+    With invite=True passwords in the file are ignored and every account is
+    created without a usable password.
+    """
+
+    def __init__(self, kind, invite=False, batch_size=None, workers=None):
+        self.kind = kind
+        self.invite = invite
+        self.batch_size = batch_size or getattr(settings, 'IMPORT_BATCH_SIZE', 1000)
+        self.workers = workers or getattr(settings, 'IMPORT_HASH_WORKERS', 4)
+        self.serializer_class = ImportDoctorSerializer if kind == 'doctors' else ImportPatientSerializer
+        self.context = {}
+        if kind == 'doctors':
+            self.context['specialties'] = {
+                name.lower(): specialty_id for specialty_id, name in Specialty.objects.values_list('id', 'name')
+            }
+        # Emails and phones taken by earlier rows of this import
+        self.seen_emails = set()
+        self.seen_phones = set()
+        self.result = {'created': 0, 'duplicates': 0, 'invalid': 0, 'errors': []}
+        self.pool = None
+
+    def add_error(self, line, errors):
+        if len(self.result['errors']) < MAX_REPORTED_ERRORS:
+            self.result['errors'].append({'row': line, 'errors': errors})
+
+    def run(self, rows):
+        """Import an iterable of row dicts and return counts and the first errors."""
+        rows = enumerate(rows, start=1)
+        try:
+            while True:
+                batch = list(islice(rows, self.batch_size))
+                if not batch:
+                    break
+                self.import_batch(batch)
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown()
+                self.pool = None
+        self.result['errors'].sort(key=lambda error: error['row'])
+        return self.result
+
+    def hash_passwords(self, passwords):
+        if self.workers > 1 and self.pool is None and sum(1 for password in passwords if password) > 1:
+            self.pool = create_hash_pool(self.workers)
+        return hash_passwords(passwords, self.pool, self.workers)
+
+    def validate(self, batch):
+        valid = []
+        for line, row in batch:
+            if not isinstance(row, dict):
+                self.result['invalid'] += 1
+                self.add_error(line, {'row': ['Not a JSON object']})
+                continue
+            serializer = self.serializer_class(data=row, context=self.context)
+            if serializer.is_valid():
+                valid.append((line, serializer.validated_data))
+            else:
+                self.result['invalid'] += 1
+                self.add_error(line, serializer.errors)
+        return valid
+
+    def dedupe(self, valid):
+        emails = {data['email'] for _, data in valid}
+        phones = {data['phone'] for _, data in valid if data['phone']}
+        registered_emails, registered_phones = find_registered(emails, phones)
+        unique = []
+        for line, data in valid:
+            if data['email'] in registered_emails or data['email'] in self.seen_emails:
+                reason = 'Email is already registered'
+            elif data['phone'] and (data['phone'] in registered_phones or data['phone'] in self.seen_phones):
+                reason = 'Phone is already registered'
+            else:
+                self.seen_emails.add(data['email'])
+                if data['phone']:
+                    self.seen_phones.add(data['phone'])
+                unique.append((line, data))
+                continue
+            self.result['duplicates'] += 1
+            self.add_error(line, {'duplicate': [reason]})
+        return unique
+
+    def import_batch(self, batch):
+        valid = self.dedupe(self.validate(batch))
+        if not valid:
+            return
+        passwords = ['' if self.invite else data['password'] for _, data in valid]
+        hashed = self.hash_passwords(passwords)
+        rows = [(line, data, password) for (line, data), password in zip(valid, hashed)]
+        try:
+            self.write(rows)
+            return
+        except IntegrityError:
+            pass
+        # Some of these people registered since the duplicate check: drop them and retry the rest
+        rows = self.drop_registered(rows)
+        try:
+            self.write(rows)
+            return
+        except IntegrityError:
+            pass
+        # Still conflicting: write row by row so one row cannot fail the others
+        for row in rows:
+            try:
+                self.write([row])
+            except IntegrityError:
+                self.result['duplicates'] += 1
+                self.add_error(row[0], {'duplicate': ['Email is already registered']})
+
+    def drop_registered(self, rows):
+        """Rows whose email or phone is not registered yet; the others are reported as duplicates."""
+        registered_emails, registered_phones = find_registered(
+            {data['email'] for _, data, _ in rows},
+            {data['phone'] for _, data, _ in rows if data['phone']}
+        )
+        remaining = []
+        for line, data, password in rows:
+            if data['email'] in registered_emails:
+                reason = 'Email is already registered'
+            elif data['phone'] and data['phone'] in registered_phones:
+                reason = 'Phone is already registered'
+            else:
+                remaining.append((line, data, password))
+                continue
+            self.result['duplicates'] += 1
+            self.add_error(line, {'duplicate': [reason]})
+        return remaining
+
+    def write(self, rows):
+        """Create the users and profiles of (line, data, password hash) rows in one transaction."""
+        if not rows:
+            return
+        user_type = 'doctor' if self.kind == 'doctors' else 'patient'
+        users = [
+            User(password=password, user_type=user_type, **{field: data[field] for field in USER_FIELDS})
+            for _, data, password in rows
+        ]
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            profile_ids = self.create_profiles([data for _, data, _ in rows], users)
+        self.result['created'] += len(users)
+        now = users[0].created_at
+
+        if self.kind == 'doctors':
+            from apps.doctors.signals import refresh_doctors
+            refresh_doctors(profile_ids)
+            users_imported.send(sender=Doctor, patient_ids=[], doctor_ids=profile_ids, created_at=now)
+        else:
+            users_imported.send(sender=Patient, patient_ids=profile_ids, doctor_ids=[], created_at=now)
+
+    def create_profiles(self, rows, users):
+        skip = set(ImportUserSerializer().fields)
+        if self.kind == 'patients':
+            patients = Patient.objects.bulk_create([
+                Patient(user=user, **{field: value for field, value in data.items() if field not in skip})
+                for data, user in zip(rows, users)
+            ])
+            return [patient.pk for patient in patients]
+
+        doctors = Doctor.objects.bulk_create([
+            Doctor(user=user, **{field: value for field, value in data.items()
+                                 if field not in skip and field != 'specializations'})
+            for data, user in zip(rows, users)
+        ])
+        through = Doctor.specialization.through
+        through.objects.bulk_create([
+            through(doctor_id=doctor.pk, specialty_id=specialty_id)
+            for data, doctor in zip(rows, doctors)
+            for specialty_id in dict.fromkeys(data['specializations'])
+        ])
+        return [doctor.pk for doctor in doctors]
+
+
+def import_users(kind, rows, invite=False, batch_size=None, workers=None):
+    """Import patient or doctor rows; see Importer."""
+    return Importer(kind, invite=invite, batch_size=batch_size, workers=workers).run(rows)
@@ -0,0 +1,45 @@
+import os
+
+from django.core.management.base import BaseCommand
+from apps.users.exports import FILE_FORMATS
+from apps.users.importers import IMPORT_KINDS, import_users, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Bulk import patients or doctors from a CSV or NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=IMPORT_KINDS, help='What the file contains')
+        parser.add_argument('path', type=str, help='CSV or NDJSON file, one person per row')
+        parser.add_argument('--file-format', choices=FILE_FORMATS, default=None,
+                            help='File format (default: from the file extension)')
+        parser.add_argument('--invite', action='store_true',
+                            help='Ignore passwords and create accounts that set one by password reset')
+        parser.add_argument('--batch-size', type=int, default=None, help='Rows written per batch')
+        parser.add_argument('--workers', type=int, default=None, help='Processes hashing passwords')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['file_format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format not in FILE_FORMATS:
+            self.stdout.write(self.style.ERROR(
+                f"ERROR: Unknown file format, use --file-format with one of: {', '.join(FILE_FORMATS)}"
+            ))
+            return
+
+        try:
+            with open(path, encoding='utf-8-sig', newline='') as file:
+                result = import_users(
+                    options['kind'], read_rows(file, file_format), invite=options['invite'],
+                    batch_size=options['batch_size'], workers=options['workers']
+                )
+        except OSError as e:
+            self.stdout.write(self.style.ERROR(f'ERROR: {e}'))
+            return
+
+        for error in result['errors']:
+            self.stdout.write(self.style.WARNING(f"Row {error['row']}: {error['errors']}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"SUCCESS: Imported {result['created']} {options['kind']}, "
+            f"skipped {result['duplicates']} duplicates and {result['invalid']} invalid rows"
+        ))
@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from django.contrib.auth import get_user_model
 from .serializers import UserSerializer
+from core.pagination import SwitchablePagination
 
 User = get_user_model()
 
@@ -13,6 +14,8 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAdminUser]
+    pagination_class = SwitchablePagination
+    keyset_ordering = ('-created_at', '-id')
     
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def me(self, request):
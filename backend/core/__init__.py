@@ -1,2 +1,5 @@
 # Core package
 
+from .celery import app as celery_app
+
+__all__ = ('celery_app',)
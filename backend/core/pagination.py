@@ -0,0 +1,208 @@
+"""
+Shared pagination classes.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import ValidationError as ParameterError
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination over a unique ordering.
+    
+    Each page starts right after the ordering key of the previous page's last
+    row, so the database seeks into an index on the ordering columns instead
+    of counting rows or scanning past an OFFSET. The ordering must end with a
+    unique field (usually `id`) and use one direction for every field.
+    Responses carry a `next` link and no total count.
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = None
+    
+    def __init__(self, ordering=None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+    
+    def get_ordering(self, request, queryset, view):
+        """
+        Get the keyset ordering.
+        
+        Uses the paginator's ordering, then an `?ordering=` the view's
+        OrderingFilter accepts, then the view's `keyset_ordering`, then the
+        model's Meta.ordering. An `id` tie-breaker is added when missing.
+        """
+        if self.ordering:
+            return self.ordering
+        ordering = None
+        for backend in getattr(view, 'filter_backends', ()):
+            if issubclass(backend, OrderingFilter) and backend.ordering_param in request.query_params:
+                ordering = backend().get_ordering(request, queryset, view)
+                if len({field.startswith('-') for field in ordering}) > 1:
+                    raise ParameterError({'ordering': 'Cursor pagination needs one direction for all fields'})
+        ordering = list(ordering or getattr(view, 'keyset_ordering', None)
+                        or queryset.model._meta.ordering or ['id'])
+        if ordering[-1].lstrip('-') != 'id':
+            ordering.append('-id' if ordering[0].startswith('-') else 'id')
+        return tuple(ordering)
+    
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+    
+    def get_fields(self, queryset, ordering):
+        """Resolve the ordering to its model fields and whether it is descending."""
+        descending = ordering[0].startswith('-')
+        fields = []
+        for name in ordering:
+            if name.startswith('-') != descending:
+                raise ValueError('Keyset ordering fields must all use the same direction')
+            field = queryset.model._meta.get_field(name.lstrip('-'))
+            if field.null:
+                # NULLs never compare greater or smaller, so rows would be skipped
+                raise ParameterError({'ordering': f'Cursor pagination cannot order by {field.name}'})
+            fields.append(field)
+        return fields, descending
+    
+    def encode_cursor(self, fields, obj):
+        key = [field.value_to_string(obj) for field in fields]
+        return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+    
+    def decode_cursor(self, fields, cursor):
+        """Decode a cursor into ordering key values; raises NotFound if invalid."""
+        try:
+            key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if not isinstance(key, list) or len(key) != len(fields):
+                raise ValueError
+            return [field.to_python(value) for field, value in zip(fields, key)]
+        except (binascii.Error, ValueError, TypeError, ValidationError):
+            raise NotFound('Invalid cursor')
+    
+    def get_seek_filter(self, fields, values, descending):
+        """
+        Build the condition for rows after the key `values`.
+    
+        Equivalent to the row comparison (a, b, c) > (x, y, z), written as a
+        range on the leading field the index can seek on, refined for ties.
+        """
+        after = 'lt' if descending else 'gt'
+        names = [field.name for field in fields]
+        ties = Q()
+        for position, name in enumerate(names):
+            equal = {names[index]: values[index] for index in range(position)}
+            ties |= Q(**equal, **{f'{name}__{after}': values[position]})
+        return Q(**{f'{names[0]}__{after}e': values[0]}) & ties
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        fields, descending = self.get_fields(queryset, self.get_ordering(request, queryset, view))
+        queryset = queryset.order_by(*[('-' if descending else '') + field.name for field in fields])
+    
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            values = self.decode_cursor(fields, cursor)
+            queryset = queryset.filter(self.get_seek_filter(fields, values, descending))
+    
+        page_size = self.get_page_size(request)
+        page = list(queryset[:page_size + 1])
+        self.next_cursor = None
+        if len(page) > page_size:
+            page = page[:page_size]
+            self.next_cursor = self.encode_cursor(fields, page[-1])
+        return page
+    
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor
+        )
+    
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+    
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class SwitchablePagination(BasePagination):
+    """
+    Page number pagination with an opt-in keyset mode.
+    
+    Clients ask for keyset pages with `?pagination=cursor` (following `next`
+    links keeps the mode, since they carry a `cursor`); viewsets can make it
+    their default with `pagination_mode = 'cursor'`, in which case
+    `?pagination=page` switches back. Keyset pages skip the COUNT(*) and
+    OFFSET scans of numbered pages but have no total count.
+    """
+    mode_query_param = 'pagination'
+    modes = ('page', 'cursor')
+    
+    def __init__(self):
+        self.page_paginator = PageNumberPagination()
+        self.keyset_paginator = KeysetPagination()
+        self.paginator = self.page_paginator
+    
+    def get_mode(self, request, view):
+        if self.keyset_paginator.cursor_query_param in request.query_params:
+            return 'cursor'
+        mode = request.query_params.get(self.mode_query_param)
+        if mode not in self.modes:
+            mode = getattr(view, 'pagination_mode', 'page')
+        return mode
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.get_mode(request, view) == 'cursor':
+            self.paginator = self.keyset_paginator
+        else:
+            self.paginator = self.page_paginator
+        return self.paginator.paginate_queryset(queryset, request, view)
+    
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+    
+    def get_paginated_response_schema(self, schema):
+        return self.page_paginator.get_paginated_response_schema(schema)
+    
+    def get_schema_operation_parameters(self, view):
+        return [
+            *self.page_paginator.get_schema_operation_parameters(view),
+            {
+                'name': self.mode_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Pagination mode: page (default) or cursor.',
+                'schema': {'type': 'string', 'enum': list(self.modes)},
+            },
+            {
+                'name': self.keyset_paginator.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Cursor of the next page in cursor mode.',
+                'schema': {'type': 'string'},
+            },
+        ]
@@ -0,0 +1,24 @@
+"""
+Shared serializer helpers.
+"""
+
+
+class EagerLoadingMixin:
+    """
+    Declare the query plan a serializer's nested fields need.
+    
+    Serializers list the relations to join in `select_related_fields` and
+    the many-valued relations to prefetch in `prefetch_related_fields`;
+    views call `setup_eager_loading` on their queryset before serializing.
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Apply the serializer's select/prefetch plan to a queryset."""
+        if cls.select_related_fields:
+            queryset = queryset.select_related(*cls.select_related_fields)
+        if cls.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*cls.prefetch_related_fields)
+        return queryset
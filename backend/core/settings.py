@@ -37,6 +37,7 @@ INSTALLED_APPS = [
     'apps.consultations',
     'apps.notifications',
     'apps.payments',
+    'apps.analytics',
 ]
 
 MIDDLEWARE = [
@@ -175,6 +176,36 @@ EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
 # Redis Configuration (for caching and Celery)
 REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
 
+# Cache: Redis when REDIS_URL is configured, local memory otherwise
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+
+# Slot holds during checkout: Redis when REDIS_URL is configured, process memory otherwise
+SLOT_HOLD_BACKEND = 'redis' if os.environ.get('REDIS_URL') else 'memory'
+SLOT_HOLD_MINUTES = int(os.environ.get('SLOT_HOLD_MINUTES', 10))
+SLOT_HOLD_MAX_MINUTES = 15
+
+# Minutes a waitlisted patient has to take an offered slot (capped by SLOT_HOLD_MAX_MINUTES)
+WAITLIST_OFFER_MINUTES = int(os.environ.get('WAITLIST_OFFER_MINUTES', 15))
+
+# Doctor directory facet counts are cached per filter combination
+FACET_CACHE_SECONDS = int(os.environ.get('FACET_CACHE_SECONDS', 60))
+
+# Admin analytics for closed date ranges are cached
+ANALYTICS_CACHE_SECONDS = int(os.environ.get('ANALYTICS_CACHE_SECONDS', 86400))
+
+# Rows fetched per round trip by the streaming admin exports
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 2000))
+
+# Bulk patient and doctor imports: rows written per batch and password hashing processes
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 1000))
+IMPORT_HASH_WORKERS = int(os.environ.get('IMPORT_HASH_WORKERS', os.cpu_count() or 1))
+
 # Celery Configuration
 CELERY_BROKER_URL = REDIS_URL
 CELERY_RESULT_BACKEND = REDIS_URL
@@ -182,6 +213,34 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'sweep-stale-appointments': {
+        'task': 'apps.appointments.tasks.sweep_stale_appointments',
+        'schedule': int(os.environ.get('APPOINTMENT_SWEEP_INTERVAL', 3600)),
+    },
+    'expire-waitlist-offers': {
+        'task': 'apps.appointments.tasks.expire_waitlist_offers',
+        'schedule': 60,
+    },
+    'reconcile-daily-stats': {
+        'task': 'apps.analytics.tasks.reconcile_daily_stats',
+        'schedule': 24 * 60 * 60,
+    },
+    'generate-slot-inventory': {
+        'task': 'apps.doctors.tasks.generate_slot_inventory',
+        'schedule': 24 * 60 * 60,
+    },
+}
+
+# Appointments still pending/confirmed this many days after their date are closed by the sweeper
+APPOINTMENT_SWEEP_GRACE_DAYS = int(os.environ.get('APPOINTMENT_SWEEP_GRACE_DAYS', 1))
+APPOINTMENT_SWEEP_BATCH_SIZE = int(os.environ.get('APPOINTMENT_SWEEP_BATCH_SIZE', 500))
+
+# Slot inventory: number of days ahead generated from doctor schedules
+SLOT_INVENTORY_DAYS = int(os.environ.get('SLOT_INVENTORY_DAYS', 30))
+
+# Autocomplete: seconds after which each process rebuilds its prefix index
+AUTOCOMPLETE_REBUILD_SECONDS = int(os.environ.get('AUTOCOMPLETE_REBUILD_SECONDS', 300))
 
 # File Upload Settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
@@ -23,12 +23,13 @@ const Dashboard = () => {
         appointmentService.list()
       ])
 
-      setUpcomingAppointments(upcoming.slice(0, 3)) // Show only 3 upcoming
+      setUpcomingAppointments(upcoming.results.slice(0, 3)) // Show only 3 upcoming
 
       const completed = all.filter(a => a.status === 'completed').length
 
       setStats({
-        upcomingAppointments: upcoming.length,
+        // Only the first page is loaded; a next link means there are more
+        upcomingAppointments: `${upcoming.results.length}${upcoming.next ? '+' : ''}`,
         totalAppointments: all.length,
         completedAppointments: completed,
       })
@@ -125,6 +125,15 @@ export const doctorService = {
   },
 }
 
+// Appointment feeds are cursor paginated: each call loads one page ({ results, next });
+// pass next to appointmentService.more() when the user asks for the following page
+const FEED_PAGE_SIZE = 20
+
+const fetchFeedPage = async (url, params) => {
+  const response = await api.get(url, { params })
+  return { results: response.data.results, next: response.data.next }
+}
+
 export const appointmentService = {
   list: async (params = {}) => {
     const response = await api.get('/appointments/', { params })
@@ -146,14 +155,11 @@ export const appointmentService = {
     const response = await api.patch(`/appointments/${id}/update_status/`, { status })
     return response.data
   },
-  upcoming: async () => {
-    const response = await api.get('/appointments/upcoming/')
-    return response.data
-  },
-  past: async () => {
-    const response = await api.get('/appointments/past/')
-    return response.data
-  },
+  upcoming: async (pageSize = FEED_PAGE_SIZE) =>
+    fetchFeedPage('/appointments/upcoming/', { page_size: pageSize }),
+  past: async (pageSize = FEED_PAGE_SIZE) =>
+    fetchFeedPage('/appointments/past/', { page_size: pageSize }),
+  more: async (next) => fetchFeedPage(next),
 }
 
 export default api